@@ -14,6 +14,7 @@ import os
 from pathlib import Path
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -39,16 +40,26 @@ ALLOWED_HOSTS = [
 
 # Application definition
 
+# Perfil do processo: "full" (padrão) serve tudo, inclusive o admin; "api" é para workers que só atendem
+# /api/ com JWT e rodam sem admin, sessões, mensagens e CSRF. O admin fica num serviço com o perfil "full".
+DJANGO_PROFILE = os.environ.get('DJANGO_PROFILE', 'full').lower()
+if DJANGO_PROFILE not in {'full', 'api'}:
+    raise ImproperlyConfigured(f"DJANGO_PROFILE inválido: {DJANGO_PROFILE!r} (use 'full' ou 'api').")
+API_PROFILE = DJANGO_PROFILE == 'api'
+
+# Apps opcionais: o admin (e todos os admin.py) e o authtoken do DRF, que a API não usa (o login é JWT).
+ADMIN_ENABLED = not API_PROFILE and os.environ.get('ADMIN_ENABLED', 'True').lower() in {'1', 'true', 'yes'}
+AUTHTOKEN_ENABLED = os.environ.get('AUTHTOKEN_ENABLED', 'False').lower() in {'1', 'true', 'yes'}
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    *(['django.contrib.admin'] if ADMIN_ENABLED else []),
     'django.contrib.auth',
     'django.contrib.contenttypes',
-    'django.contrib.sessions',
-    'django.contrib.messages',
+    *([] if API_PROFILE else ['django.contrib.sessions', 'django.contrib.messages']),
     'django.contrib.staticfiles',
     # Third-party
     'rest_framework',
-    'rest_framework.authtoken',
+    *(['rest_framework.authtoken'] if AUTHTOKEN_ENABLED else []),
     'drf_spectacular',
     'corsheaders',
     # Local
@@ -57,6 +68,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.usage.ClubUsageMiddleware',
+    'core.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +79,17 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Só o admin (login por sessão) precisa destes; a API autentica pelo JWT em cada requisição e as views do
+# DRF já são isentas de CSRF. O benchmark_middleware mede quanto o perfil "api" economiza sem eles.
+ADMIN_ONLY_MIDDLEWARE = (
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+)
+if API_PROFILE:
+    MIDDLEWARE = [name for name in MIDDLEWARE if name not in ADMIN_ONLY_MIDDLEWARE]
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -77,7 +101,7 @@ TEMPLATES = [
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
+                *([] if API_PROFILE else ['django.contrib.messages.context_processors.messages']),
             ],
         },
     },
@@ -94,6 +118,10 @@ DATABASES = {
     'default': dj_database_url.config(default=os.environ.get('DATABASE_URL', default_db_url), conn_max_age=600),
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # Lookups de trigramas (pg_trgm) usados por /api/search/
+    INSTALLED_APPS.append('django.contrib.postgres')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -146,6 +174,13 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_THROTTLE_CLASSES': (
+        'core.usage.ClubQuotaThrottle',
+    ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -158,6 +193,10 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# Schema OpenAPI gerado no build (python manage.py build_schema) e versão do código que o invalida
+SCHEMA_FILE = os.environ.get('SCHEMA_FILE', str(BASE_DIR / 'schema.json'))
+CODE_VERSION = os.environ.get('CODE_VERSION') or os.environ.get('RAILWAY_GIT_COMMIT_SHA', '')
+
 CORS_ALLOW_CREDENTIALS = True
 
 raw_cors = os.environ.get('CORS_ALLOWED_ORIGINS', '')
@@ -180,3 +219,80 @@ EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS", "True").lower() in {"1", "true",
 EMAIL_USE_SSL = os.environ.get("EMAIL_USE_SSL", "False").lower() in {"1", "true", "yes"}
 DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "AceBook <no-reply@localhost>")
 FRONTEND_RESET_URL = os.environ.get("FRONTEND_RESET_URL", "http://localhost:3000/reset-password")
+
+# Cache compartilhado entre workers e o run_scheduler (ex.: redis://..., ou
+# "db" para o DatabaseCache após `python manage.py createcachetable`)
+CACHE_URL = os.environ.get("CACHE_URL", "")
+if CACHE_URL.startswith("redis"):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}}
+elif CACHE_URL == "db":
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}}
+
+# Sem cache compartilhado, dados invalidados por outro worker (disponibilidade, regras de reserva) ficam em
+# cache no máximo estes segundos (core.caching.invalidated_ttl)
+LOCAL_CACHE_MAX_TTL = int(os.environ.get("LOCAL_CACHE_MAX_TTL", "5"))
+
+# Compressão das respostas (core.middleware.CompressionMiddleware)
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Stream SSE de ocupação das quadras (/api/clubs/live/)
+LIVE_EVENTS_BACKEND = os.environ.get("LIVE_EVENTS_BACKEND", "core.live.LocalBackend")
+LIVE_EVENTS_HEARTBEAT = int(os.environ.get("LIVE_EVENTS_HEARTBEAT", "15"))
+LIVE_EVENTS_QUEUE_SIZE = int(os.environ.get("LIVE_EVENTS_QUEUE_SIZE", "100"))
+
+# Índice em memória dos slugs de clube (/api/clubs/check-slug/)
+CLUB_SLUG_INDEX_TTL = int(os.environ.get("CLUB_SLUG_INDEX_TTL", "300"))
+CLUB_SLUG_SUGGESTIONS = 3
+CLUB_SLUG_MAX_SUGGESTIONS = 10
+CLUB_SLUG_SUGGESTION_SUFFIXES = ("clube", "tenis", "sp", "rj")
+
+# Importação em lote de jogadores (/api/club-users/import/)
+BULK_IMPORT_MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", "10000"))
+BULK_IMPORT_BATCH_SIZE = 500
+BULK_IMPORT_HASH_WORKERS = int(os.environ.get("BULK_IMPORT_HASH_WORKERS", "0")) or None
+
+# Idempotency-Key em POST /api/reservations/ e /api/auth/register/
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", str(24 * 60 * 60)))
+IDEMPOTENCY_PENDING_TIMEOUT = int(os.environ.get("IDEMPOTENCY_PENDING_TIMEOUT", "60"))
+
+# Disponibilidade das quadras em cache e jobs do run_scheduler
+AVAILABILITY_CACHE_TTL = int(os.environ.get("AVAILABILITY_CACHE_TTL", str(36 * 60 * 60)))
+SCHEDULER_LOCK_TTL = int(os.environ.get("SCHEDULER_LOCK_TTL", "120"))
+
+# Clube (tenant) da requisição, resolvido uma vez e guardado em cache
+TENANT_CLUB_CACHE_TTL = int(os.environ.get("TENANT_CLUB_CACHE_TTL", "300"))
+
+# Admin: acima deste total estimado pelo PostgreSQL, a changelist não roda COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get("ADMIN_ESTIMATED_COUNT_THRESHOLD", "100000"))
+
+# Regras de reserva compiladas por clube (invalidadas ao salvar a BookingPolicy)
+BOOKING_POLICY_CACHE_TTL = int(os.environ.get("BOOKING_POLICY_CACHE_TTL", str(60 * 60)))
+
+# POST /api/batch/: máximo de sub-requisições por chamada
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "20"))
+
+# Feeds ICS: quantos dias à frente entram no calendário
+CALENDAR_FEED_HORIZON_DAYS = int(os.environ.get("CALENDAR_FEED_HORIZON_DAYS", "90"))
+
+# GET /api/search/: máximo de resultados e validade do índice em memória (bancos sem pg_trgm)
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "50"))
+SEARCH_INDEX_TTL = int(os.environ.get("SEARCH_INDEX_TTL", "300"))
+
+# GET /api/sync/: alterações por chamada, retenção do log e espera para transações abertas
+SYNC_MAX_CHANGES = int(os.environ.get("SYNC_MAX_CHANGES", "500"))
+SYNC_LOG_RETENTION_DAYS = int(os.environ.get("SYNC_LOG_RETENTION_DAYS", "30"))
+SYNC_SETTLE_SECONDS = int(os.environ.get("SYNC_SETTLE_SECONDS", "5"))
+
+# Log de auditoria: entradas em memória gravadas em lote (a cada N entradas ou N segundos); as que falham
+# voltam para o buffer, até N pendentes
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL = int(os.environ.get("AUDIT_FLUSH_INTERVAL", "2"))
+AUDIT_MAX_PENDING = int(os.environ.get("AUDIT_MAX_PENDING", "10000"))
+
+# Uso da API por clube (ClubUsage): contadores gravados a cada N segundos e cotas de requisições por hora
+# (padrão dos clubes sem cota própria; 0 desliga)
+USAGE_FLUSH_INTERVAL = int(os.environ.get("USAGE_FLUSH_INTERVAL", "60"))
+USAGE_RETENTION_DAYS = int(os.environ.get("USAGE_RETENTION_DAYS", "90"))
+CLUB_HOURLY_SOFT_QUOTA = int(os.environ.get("CLUB_HOURLY_SOFT_QUOTA", "0"))
+CLUB_HOURLY_HARD_QUOTA = int(os.environ.get("CLUB_HOURLY_HARD_QUOTA", "0"))
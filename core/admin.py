@@ -1,25 +1,101 @@
+import json
+
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.forms import Media
+from django.utils.functional import cached_property
+from django.utils.translation import gettext as _
+
+from .models import Club, ClubUsage, ClubUser, Coach, Court, CourtMaintenanceWindow, Reservation
+
+
+class EstimatedCountPaginator(Paginator):
+    """No PostgreSQL, usa a estimativa do planejador em vez de ``COUNT(*)`` quando o resultado é grande."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """Filtro por relação com busca (select2), sem carregar a tabela relacionada inteira na lateral."""
+
+    template = "admin/core/autocomplete_filter.html"
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
 
-from .models import Club, ClubUser, Coach, Court, Reservation
+    def choices(self, changelist):
+        value = self.lookup_val[0] if self.lookup_val else None
+        self.query_string = changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull])
+        formfield = self.field.formfield(
+            required=False, widget=AutocompleteSelect(self.field, changelist.model_admin.admin_site)
+        )
+        self.rendered_widget = formfield.widget.render(
+            self.lookup_kwarg,
+            value,
+            attrs={"id": f"filter_{self.field_path}", "style": "width: 100%"},
+        )
+        yield {"selected": value is None, "query_string": self.query_string, "display": _("All")}
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist para tabelas grandes: contagem estimada, sem contagem total nem facetas."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    @property
+    def media(self):
+        autocomplete = AutocompleteSelect(None, self.admin_site).media
+        return super().media + autocomplete + Media(js=["admin/core/js/autocomplete_filter.js"])
 
 
 @admin.register(Club)
 class ClubAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug")
+    list_display = ("name", "slug", "hourly_soft_quota", "hourly_hard_quota")
+    ordering = ("name",)
     search_fields = ("name", "slug")
 
 
 @admin.register(ClubUser)
-class ClubUserAdmin(admin.ModelAdmin):
+class ClubUserAdmin(LargeTableAdmin):
     list_display = ("username", "email", "role", "club")
-    list_filter = ("role", "club")
-    search_fields = ("username", "email")
+    list_filter = ("role", ("club", AutocompleteFilter))
+    list_select_related = ("club",)
+    autocomplete_fields = ("club",)
+    ordering = ("username",)
+    # Username é o email: busca por prefixo sem diferenciar maiúsculas, coberta no PostgreSQL pelo
+    # índice em upper(username) da migration 0021.
+    search_fields = ("username__istartswith",)
+    search_help_text = "Início do email do usuário."
 
 
 @admin.register(Court)
 class CourtAdmin(admin.ModelAdmin):
     list_display = ("name", "club", "surface", "status", "opens_at", "closes_at")
     list_filter = ("club", "surface", "status")
+    list_select_related = ("club",)
+    autocomplete_fields = ("club",)
     search_fields = ("name",)
 
 
@@ -27,11 +103,46 @@ class CourtAdmin(admin.ModelAdmin):
 class CoachAdmin(admin.ModelAdmin):
     list_display = ("name", "club", "phone")
     list_filter = ("club",)
+    list_select_related = ("club",)
+    autocomplete_fields = ("club",)
     search_fields = ("name", "phone")
 
 
 @admin.register(Reservation)
-class ReservationAdmin(admin.ModelAdmin):
+class ReservationAdmin(LargeTableAdmin):
     list_display = ("court", "player", "start_time", "end_time", "status")
-    list_filter = ("status", "type", "club")
-    search_fields = ("court__name", "player__username")
+    list_filter = (
+        "status",
+        "type",
+        ("club", AutocompleteFilter),
+        ("court", AutocompleteFilter),
+        ("player", AutocompleteFilter),
+    )
+    list_select_related = ("court", "player")
+    autocomplete_fields = ("club", "court", "player", "coach")
+    date_hierarchy = "start_time"
+    search_fields = ("player__username__istartswith",)
+    search_help_text = "Início do email do jogador."
+
+
+@admin.register(CourtMaintenanceWindow)
+class CourtMaintenanceWindowAdmin(admin.ModelAdmin):
+    list_display = ("court", "start_time", "end_time", "reason")
+    list_select_related = ("court",)
+    autocomplete_fields = ("club", "court", "created_by")
+    date_hierarchy = "start_time"
+
+
+@admin.register(ClubUsage)
+class ClubUsageAdmin(LargeTableAdmin):
+    """Uso por clube e hora; ordenar por requisições ou tempo no banco mostra os clubes mais pesados."""
+
+    list_display = ("period", "club", "requests", "throttled", "queries", "db_time_ms", "rows")
+    list_filter = (("club", AutocompleteFilter),)
+    list_select_related = ("club",)
+    date_hierarchy = "period"
+    ordering = ("-period", "-requests")
+    readonly_fields = ("club", "period", "requests", "throttled", "queries", "db_time_ms", "rows")
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,224 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+
+from .models import AuditLogEntry, Club, ClubUser, Coach, Court, Reservation
+
+logger = logging.getLogger(__name__)
+
+KINDS = {
+    Court: AuditLogEntry.Kind.COURT,
+    Coach: AuditLogEntry.Kind.COACH,
+    Reservation: AuditLogEntry.Kind.RESERVATION,
+    ClubUser: AuditLogEntry.Kind.MEMBER,
+}
+
+# Campos fora do diff: o id já está na entrada, os demais mudam sozinhos ou não podem ir para o log.
+IGNORED_FIELDS = {"id", "updated_at", "last_login", "password"}
+
+
+@dataclass
+class AuditContext:
+    actor_id: int
+    actor_name: str
+    # (model, pk) -> valores carregados pela view antes da alteração
+    before: dict = field(default_factory=dict)
+
+
+# Usuário que está alterando dados pela API, definido pelo AuditedMixin.
+_current_context = ContextVar("audit_context", default=None)
+
+
+def snapshot(instance):
+    values = {}
+    for model_field in instance._meta.concrete_fields:
+        name = model_field.attname
+        if name in IGNORED_FIELDS:
+            continue
+        values[name] = model_field.value_from_object(instance)
+    return values
+
+
+def diff(before, after):
+    changes = {}
+    for name in sorted(before.keys() | after.keys()):
+        old, new = before.get(name), after.get(name)
+        if old != new:
+            changes[name] = [old, new]
+    return changes
+
+
+class AuditBuffer:
+    """Entradas de auditoria em memória, gravadas com ``bulk_create`` em lote.
+
+    Grava quando junta ``AUDIT_BATCH_SIZE`` entradas ou ``AUDIT_FLUSH_INTERVAL`` segundos depois da
+    primeira entrada pendente, numa thread à parte; o que sobrar é gravado na saída do processo.
+    Entradas que o banco recusa voltam para o buffer, limitado a ``AUDIT_MAX_PENDING``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._timer = None
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            full = len(self._entries) >= settings.AUDIT_BATCH_SIZE
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(settings.AUDIT_FLUSH_INTERVAL, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _requeue(self, entries):
+        """Devolve ao buffer as entradas não gravadas, para o próximo flush tentar de novo."""
+        if not entries:
+            return
+        for entry in entries:
+            # Um bulk_create desfeito pelo rollback pode ter deixado o id preenchido.
+            entry.pk = None
+        with self._lock:
+            self._entries[:0] = entries
+            dropped = len(self._entries) - settings.AUDIT_MAX_PENDING
+            if dropped > 0:
+                del self._entries[:dropped]
+                logger.error("Buffer de auditoria cheio; %d entrada(s) mais antiga(s) descartada(s)", dropped)
+            self._schedule()
+
+    def flush(self):
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not entries:
+            return 0
+        by_club = defaultdict(list)
+        for entry in entries:
+            by_club[entry.club_id].append(entry)
+        try:
+            # Clubes removidos desde a alteração ficam de fora (a entrada violaria a FK).
+            existing = set(Club.objects.filter(pk__in=by_club).values_list("pk", flat=True))
+        except DatabaseError:
+            logger.exception("Falha ao consultar os clubes de %d entrada(s) de auditoria", len(entries))
+            self._requeue(entries)
+            return 0
+        by_club = {club_id: club_entries for club_id, club_entries in by_club.items() if club_id in existing}
+        try:
+            with transaction.atomic():
+                AuditLogEntry.objects.bulk_create(
+                    [entry for club_entries in by_club.values() for entry in club_entries],
+                    batch_size=settings.AUDIT_BATCH_SIZE,
+                )
+            return sum(map(len, by_club.values()))
+        except DatabaseError:
+            logger.warning("Falha ao gravar %d entrada(s) de auditoria em lote; tentando por clube", len(entries))
+        # Uma falha não descarta as entradas dos outros clubes.
+        written = 0
+        failed = []
+        for club_id, club_entries in by_club.items():
+            try:
+                with transaction.atomic():
+                    AuditLogEntry.objects.bulk_create(club_entries, batch_size=settings.AUDIT_BATCH_SIZE)
+            except DatabaseError:
+                logger.exception("Falha ao gravar %d entrada(s) de auditoria do clube %s", len(club_entries), club_id)
+                failed.extend(club_entries)
+            else:
+                written += len(club_entries)
+        self._requeue(failed)
+        return written
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # A thread do timer abre a própria conexão; fecha para não deixá-la pendurada.
+            connections.close_all()
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
+
+
+def remember(instance):
+    """Guarda o estado do objeto carregado pela view, para o diff depois do save."""
+    context = _current_context.get()
+    if context is not None:
+        context.before[(type(instance), instance.pk)] = snapshot(instance)
+
+
+def _record(instance, action, changes):
+    context = _current_context.get()
+    club_id = instance.club_id
+    if context is None or club_id is None or not changes:
+        return
+    entry = AuditLogEntry(
+        club_id=club_id,
+        actor_id=context.actor_id,
+        actor_name=context.actor_name,
+        kind=KINDS[type(instance)],
+        object_id=instance.pk,
+        action=action,
+        changes=changes,
+        created_at=timezone.now(),
+    )
+    # Só vai para o buffer se a transação da alteração for confirmada.
+    transaction.on_commit(lambda: audit_buffer.add(entry))
+
+
+def record_save(instance, created):
+    context = _current_context.get()
+    if context is None:
+        return
+    after = snapshot(instance)
+    if created:
+        _record(instance, AuditLogEntry.Action.CREATE, diff({}, after))
+        return
+    before = context.before.pop((type(instance), instance.pk), None)
+    if before is None:
+        # Alterado sem passar pelo get_object da view: sem o antes, registra os valores atuais.
+        before = dict.fromkeys(after)
+    _record(instance, AuditLogEntry.Action.UPDATE, diff(before, after))
+    context.before[(type(instance), instance.pk)] = after
+
+
+def record_delete(instance):
+    _record(instance, AuditLogEntry.Action.DELETE, diff(snapshot(instance), {}))
+
+
+class AuditedMixin:
+    """Registra no log de auditoria as alterações feitas pela view, com os campos antes e depois."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        user = request.user
+        if request.method not in SAFE_METHODS and user.is_authenticated:
+            context = AuditContext(actor_id=user.pk, actor_name=user.get_full_name() or user.username)
+            self._audit_token = _current_context.set(context)
+
+    def dispatch(self, request, *args, **kwargs):
+        self._audit_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._audit_token is not None:
+                _current_context.reset(self._audit_token)
+
+    def get_object(self):
+        instance = super().get_object()
+        remember(instance)
+        return instance
@@ -0,0 +1,105 @@
+import time
+from collections import defaultdict
+from datetime import date as date_type, datetime, time as time_type, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import invalidated_ttl
+from .models import CourtMaintenanceWindow, Reservation
+
+
+def _version_key(court_id):
+    return f"availability-version:{court_id}"
+
+
+def _slots_key(club_id, court_id, date, version):
+    # O clube entra na chave: a consulta filtra por ele, e a quadra de outro clube não pode ler nem gravar
+    # a entrada do dono.
+    return f"availability:{club_id}:{court_id}:{date}:{version}"
+
+
+def _day_bounds(date):
+    """Início e fim (exclusivo) do dia local (TIME_ZONE), usados para reservas e manutenções."""
+    start = timezone.make_aware(datetime.combine(date_type.fromisoformat(str(date)), time_type.min))
+    return start, start + timedelta(days=1)
+
+
+def _format_kickoff(kickoff):
+    if timezone.is_naive(kickoff):
+        kickoff = timezone.make_aware(kickoff, timezone.get_current_timezone())
+    return timezone.localtime(kickoff).strftime("%H:%M")
+
+
+def _maintenance_kickoffs(start, end, date):
+    """Horários cheios (HH:00) do dia local cobertos por uma janela de manutenção."""
+    day_start, day_end = _day_bounds(date)
+    kickoff = max(timezone.localtime(start), day_start).replace(minute=0, second=0, microsecond=0)
+    end = min(end, day_end)
+    kickoffs = []
+    while kickoff < end:
+        kickoffs.append(kickoff.strftime("%H:%M"))
+        kickoff += timedelta(hours=1)
+    return kickoffs
+
+
+def _maintenance_windows(club_id, court_ids, date):
+    day_start, day_end = _day_bounds(date)
+    return CourtMaintenanceWindow.objects.filter(
+        club_id=club_id,
+        court_id__in=court_ids,
+        start_time__lt=day_end,
+        end_time__gt=day_start,
+    ).values_list("court_id", "start_time", "end_time")
+
+
+def bump_version(court_id):
+    cache.set(_version_key(court_id), time.time_ns(), None)
+
+
+def occupied_slots(club_id, court_id, date):
+    """Horários ocupados da quadra na data, com cache invalidado a cada mudança de reserva da quadra."""
+    key = _slots_key(club_id, court_id, date, cache.get(_version_key(court_id), 0))
+    occupied = cache.get(key)
+    if occupied is None:
+        day_start, day_end = _day_bounds(date)
+        kickoffs = Reservation.objects.filter(
+            club_id=club_id,
+            court_id=court_id,
+            start_time__gte=day_start,
+            start_time__lt=day_end,
+        ).values_list("start_time", flat=True)
+        occupied = {_format_kickoff(kickoff) for kickoff in kickoffs}
+        for _, start, end in _maintenance_windows(club_id, [court_id], date):
+            occupied.update(_maintenance_kickoffs(start, end, date))
+        occupied = sorted(occupied)
+        cache.set(key, occupied, invalidated_ttl(settings.AVAILABILITY_CACHE_TTL))
+    return occupied
+
+
+def warm_club(club_id, court_ids, date):
+    """Pré-calcula a disponibilidade de todas as quadras do clube numa única consulta."""
+    by_court = defaultdict(set)
+    day_start, day_end = _day_bounds(date)
+    reservations = Reservation.objects.filter(
+        club_id=club_id,
+        court_id__in=court_ids,
+        start_time__gte=day_start,
+        start_time__lt=day_end,
+    ).values_list("court_id", "start_time")
+    for court_id, kickoff in reservations:
+        by_court[court_id].add(_format_kickoff(kickoff))
+    for court_id, start, end in _maintenance_windows(club_id, court_ids, date):
+        by_court[court_id].update(_maintenance_kickoffs(start, end, date))
+
+    versions = cache.get_many([_version_key(court_id) for court_id in court_ids])
+    cache.set_many(
+        {
+            _slots_key(club_id, court_id, date, versions.get(_version_key(court_id), 0)): sorted(
+                by_court.get(court_id, ())
+            )
+            for court_id in court_ids
+        },
+        invalidated_ttl(settings.AVAILABILITY_CACHE_TTL),
+    )
@@ -0,0 +1,147 @@
+import io
+import json
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.http import Http404
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+READ_METHODS = {"GET"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Dados da conexão original repassados às sub-requisições.
+FORWARDED_META = (
+    "REMOTE_ADDR",
+    "SERVER_NAME",
+    "SERVER_PORT",
+    "HTTP_HOST",
+    "HTTP_ACCEPT_LANGUAGE",
+    "HTTP_USER_AGENT",
+    "HTTP_X_FORWARDED_FOR",
+    "HTTP_X_FORWARDED_PROTO",
+)
+
+# Headers que cada item pode mandar; os demais (Host, Authorization, ...) vêm sempre da requisição do batch.
+ALLOWED_HEADERS = {"idempotency-key", "if-none-match", "accept-language"}
+
+
+class BatchError(Exception):
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+@contextmanager
+def read_snapshot(using="default"):
+    """Uma transação para o batch inteiro: todas as sub-requisições enxergam o mesmo estado do banco."""
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor == "postgresql":
+            # READ COMMITTED tira um snapshot por comando; REPEATABLE READ mantém um só na transação.
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        yield
+
+
+def build_request(request, method, path, body=None, headers=None):
+    """Monta a sub-requisição com o usuário já autenticado na requisição do batch."""
+    parts = urlsplit(path)
+    if parts.scheme or parts.netloc or not parts.path.startswith("/"):
+        raise BatchError("Use um caminho relativo, por exemplo /api/courts/.")
+    headers = headers or {}
+    refused = sorted(name for name in headers if name.lower() not in ALLOWED_HEADERS)
+    if refused:
+        raise BatchError(f"Header(s) não permitido(s) no batch: {', '.join(refused)}.")
+    payload = b"" if body is None else json.dumps(body, cls=DjangoJSONEncoder).encode()
+    environ = {key: request.META[key] for key in FORWARDED_META if key in request.META}
+    environ.update(
+        {
+            "REQUEST_METHOD": method,
+            "SCRIPT_NAME": "",
+            "PATH_INFO": parts.path,
+            "QUERY_STRING": parts.query,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(payload)),
+            "HTTP_ACCEPT": "application/json",
+            "wsgi.input": io.BytesIO(payload),
+            "wsgi.url_scheme": request.scheme,
+        }
+    )
+    for name, value in headers.items():
+        environ[f"HTTP_{name.upper().replace('-', '_')}"] = str(value)
+
+    subrequest = WSGIRequest(environ)
+    # O DRF usa ForcedAuthentication: sem decodificar o JWT nem buscar o usuário de novo.
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def response_body(response):
+    if response.streaming:
+        response.close()
+        raise BatchError("Respostas em streaming não podem ser incluídas no batch.")
+    if isinstance(response, Response):
+        if response.data is None or response.accepted_renderer.format == "json":
+            return response.data
+        # Outros formatos (ex.: ?format=compact) mudam o conteúdo na renderização.
+        response.render()
+    content = response.content
+    if not content:
+        return None
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(content)
+    return content.decode(response.charset)
+
+
+def run_request(request, item, batch_view_class):
+    method = str(item.get("method") or "GET").upper()
+    path = item.get("path")
+    if method not in READ_METHODS | WRITE_METHODS:
+        raise BatchError(f"Método {method} não suportado no batch.")
+    if not isinstance(path, str) or not path:
+        raise BatchError("Informe o path da requisição.")
+    headers = item.get("headers") or {}
+    if not isinstance(headers, dict):
+        raise BatchError("headers deve ser um objeto.")
+
+    subrequest = build_request(request, method, path, item.get("body"), headers)
+    try:
+        match = resolve(subrequest.path_info)
+    except Resolver404:
+        raise BatchError("Rota não encontrada.", status.HTTP_404_NOT_FOUND)
+    view_class = getattr(match.func, "cls", None)
+    if not (isinstance(view_class, type) and issubclass(view_class, APIView)):
+        # Views fora do DRF (admin, schema) dependem do middleware de sessão, que a sub-requisição não passa.
+        raise BatchError("Apenas rotas da API podem ser chamadas no batch.")
+    if view_class is batch_view_class:
+        raise BatchError("Batch dentro de batch não é permitido.")
+
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+    except Http404:
+        raise BatchError("Não encontrado.", status.HTTP_404_NOT_FOUND)
+    except PermissionDenied:
+        raise BatchError("Acesso negado.", status.HTTP_403_FORBIDDEN)
+    return response.status_code, response_body(response)
+
+
+def run_batch(request, items, batch_view_class):
+    results = []
+    for item in items:
+        result = {"id": item.get("id")} if "id" in item else {}
+        try:
+            result["status"], result["body"] = run_request(request, item, batch_view_class)
+        except BatchError as exc:
+            result["status"], result["body"] = exc.status_code, {"detail": exc.detail}
+        results.append(result)
+    return results
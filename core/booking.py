@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .caching import invalidated_ttl
+from .models import BookingPolicy, Reservation
+
+# Valores usados quando o clube não tem BookingPolicy: as regras que sempre valeram.
+DEFAULT_POLICY = {
+    "max_per_day": 1,
+    "max_per_week": None,
+    "player_advance_days": 0,
+    "max_duration_minutes": None,
+    "peak_starts_at": None,
+    "peak_ends_at": None,
+    "peak_weekly_quotas": {},
+}
+
+
+def policy_cache_key(club_id):
+    return f"booking-policy:{club_id}"
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """Regras do clube já normalizadas; as de contagem viram uma única agregação por reserva."""
+
+    max_per_day: int | None = None
+    max_per_week: int | None = None
+    player_advance_days: int | None = None
+    max_duration: timedelta | None = None
+    peak_starts_at: time | None = None
+    peak_ends_at: time | None = None
+    peak_weekly_quotas: dict = field(default_factory=dict)
+
+    def is_peak(self, local_start):
+        if self.peak_starts_at is None or self.peak_ends_at is None:
+            return False
+        return self.peak_starts_at <= local_start.time() < self.peak_ends_at
+
+    def check_times(self, start, end, booked_by_player):
+        """Regras sem consulta ao banco; devolve a mensagem do primeiro limite violado."""
+        if start < timezone.now():
+            return "Não é possível criar reservas retroativas."
+        if booked_by_player and self.player_advance_days is not None:
+            days_ahead = (timezone.localtime(start).date() - timezone.localdate()).days
+            if days_ahead > self.player_advance_days:
+                if self.player_advance_days == 0:
+                    return "Jogadores só podem criar reservas para o dia atual."
+                return f"Jogadores só podem reservar com até {self.player_advance_days} dias de antecedência."
+        if self.max_duration is not None and end - start > self.max_duration:
+            return f"A reserva pode durar no máximo {int(self.max_duration.total_seconds() // 60)} minutos."
+        return None
+
+    def check_counts(self, player, start, reservation_type, exclude_id=None):
+        """Limites por dia, semana e pico avaliados numa só consulta sobre a semana do jogador."""
+        local_start = timezone.localtime(start)
+        day_start = timezone.make_aware(datetime.combine(local_start.date(), time.min))
+        day_end = day_start + timedelta(days=1)
+        week_start = day_start - timedelta(days=local_start.weekday())
+        week_end = week_start + timedelta(days=7)
+
+        counts = {}
+        if self.max_per_day is not None:
+            counts["day"] = Count("id", filter=Q(start_time__gte=day_start, start_time__lt=day_end))
+        if self.max_per_week is not None:
+            counts["week"] = Count("id")
+        peak_quota = self.peak_weekly_quotas.get(reservation_type)
+        if peak_quota is not None and self.is_peak(local_start):
+            counts["peak"] = Count(
+                "id",
+                filter=Q(
+                    type=reservation_type,
+                    start_time__time__gte=self.peak_starts_at,
+                    start_time__time__lt=self.peak_ends_at,
+                ),
+            )
+        if not counts:
+            return None
+
+        reservations = Reservation.objects.filter(
+            player=player,
+            start_time__gte=week_start,
+            start_time__lt=week_end,
+        ).exclude(status=Reservation.Status.CANCELED)
+        if exclude_id is not None:
+            reservations = reservations.exclude(pk=exclude_id)
+        totals = reservations.aggregate(**counts)
+
+        if "day" in totals and totals["day"] >= self.max_per_day:
+            if self.max_per_day == 1:
+                return "Cada jogador pode ter no máximo uma reserva por dia."
+            return f"Cada jogador pode ter no máximo {self.max_per_day} reservas por dia."
+        if "week" in totals and totals["week"] >= self.max_per_week:
+            return f"Cada jogador pode ter no máximo {self.max_per_week} reservas por semana."
+        if "peak" in totals and totals["peak"] >= peak_quota:
+            label = Reservation.Type(reservation_type).label
+            return f"Limite semanal de reservas de {label} em horário de pico atingido ({peak_quota})."
+        return None
+
+
+def compile_policy(values):
+    duration = values["max_duration_minutes"]
+    return CompiledPolicy(
+        max_per_day=values["max_per_day"],
+        max_per_week=values["max_per_week"],
+        player_advance_days=values["player_advance_days"],
+        max_duration=timedelta(minutes=duration) if duration else None,
+        peak_starts_at=values["peak_starts_at"],
+        peak_ends_at=values["peak_ends_at"],
+        peak_weekly_quotas={key: int(value) for key, value in (values["peak_weekly_quotas"] or {}).items()},
+    )
+
+
+def get_policy(club_id):
+    """Regras compiladas do clube, em cache até a política ser alterada."""
+    key = policy_cache_key(club_id)
+    compiled = cache.get(key)
+    if compiled is None:
+        values = BookingPolicy.objects.filter(club_id=club_id).values(*DEFAULT_POLICY).first()
+        compiled = compile_policy(values or DEFAULT_POLICY)
+        cache.set(key, compiled, invalidated_ttl(settings.BOOKING_POLICY_CACHE_TTL))
+    return compiled
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache():
+    """Com o cache local padrão (sem ``CACHE_URL``) cada worker tem o seu e não vê as invalidações dos outros."""
+    return not isinstance(caches["default"], LocMemCache)
+
+
+def invalidated_ttl(ttl):
+    """TTL de entradas invalidadas por versão ou delete no cache.
+
+    Num cache local a invalidação só chega ao worker que fez a alteração; nos demais a entrada
+    vale no máximo ``LOCAL_CACHE_MAX_TTL`` segundos.
+    """
+    if is_shared_cache():
+        return ttl
+    return min(ttl, settings.LOCAL_CACHE_MAX_TTL)
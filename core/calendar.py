@@ -0,0 +1,101 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import CalendarFeed, Reservation
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Quebra linhas com mais de 75 octetos (RFC 5545, seção 3.1)."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Não corta no meio de um caractere UTF-8.
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    parts.append(encoded.decode())
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def last_modified(feed):
+    """Última mudança do feed; a virada do dia também conta porque a janela de eventos anda."""
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(feed.updated_at, today)
+
+
+def etag(feed):
+    return f'"{feed.pk}-{feed.version}-{timezone.localdate():%Y%m%d}"'
+
+
+def feed_reservations(feed):
+    now = timezone.now()
+    reservations = Reservation.objects.filter(
+        end_time__gte=now,
+        start_time__lt=now + timedelta(days=settings.CALENDAR_FEED_HORIZON_DAYS),
+    ).exclude(status=Reservation.Status.CANCELED)
+    if feed.kind == CalendarFeed.Kind.PLAYER:
+        reservations = reservations.filter(player_id=feed.player_id)
+    else:
+        reservations = reservations.filter(court_id=feed.court_id)
+    return reservations.select_related("court", "coach").order_by("start_time")
+
+
+def render_feed(feed):
+    stamp = format_utc(feed.updated_at)
+    yield fold("BEGIN:VCALENDAR")
+    yield fold("VERSION:2.0")
+    yield fold("PRODID:-//AceBook//Reservas//PT")
+    yield fold("CALSCALE:GREGORIAN")
+    yield fold(f"X-WR-CALNAME:{escape(feed_name(feed))}")
+    for reservation in feed_reservations(feed).iterator(chunk_size=500):
+        if feed.kind == CalendarFeed.Kind.PLAYER:
+            summary = f"{reservation.get_type_display()} - {reservation.court.name}"
+        else:
+            # Feed público da quadra: não expõe o nome do jogador.
+            summary = f"{reservation.get_type_display()} (reservado)"
+        if reservation.coach_id:
+            summary += f" com {reservation.coach.name}"
+        yield fold("BEGIN:VEVENT")
+        yield fold(f"UID:reservation-{reservation.pk}@acebook")
+        yield fold(f"DTSTAMP:{stamp}")
+        yield fold(f"DTSTART:{format_utc(reservation.start_time)}")
+        yield fold(f"DTEND:{format_utc(reservation.end_time)}")
+        yield fold(f"SUMMARY:{escape(summary)}")
+        yield fold(f"LOCATION:{escape(reservation.court.name)}")
+        yield fold("END:VEVENT")
+    yield fold("END:VCALENDAR")
+
+
+def feed_name(feed):
+    if feed.kind == CalendarFeed.Kind.PLAYER:
+        return "AceBook - Minhas reservas"
+    return f"AceBook - {feed.court.name}"
+
+
+def bump_versions(player_ids=(), court_ids=(), club_id=None):
+    condition = Q(player_id__in=[pk for pk in player_ids if pk]) | Q(court_id__in=[pk for pk in court_ids if pk])
+    if club_id is not None:
+        condition |= Q(club_id=club_id)
+    CalendarFeed.objects.filter(condition).update(version=F("version") + 1, updated_at=timezone.now())
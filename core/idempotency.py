@@ -0,0 +1,117 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+
+
+def _lookup(request, key):
+    user_id = request.user.pk if request.user and request.user.is_authenticated else "anon"
+    scope = f"{user_id}:{request.method}:{request.path}:{key}"
+    return hashlib.sha256(scope.encode()).hexdigest()
+
+
+def _request_hash(request):
+    # HMAC em vez de hash puro: o corpo do registro contém a senha.
+    canonical = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return salted_hmac("core.idempotency", canonical, algorithm="sha256").hexdigest()
+
+
+def _replay(record, request_hash):
+    if record.request_hash != request_hash:
+        return Response(
+            {"detail": f"{HEADER} já utilizada com outro conteúdo."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record.status_code is None:
+        return Response(
+            {"detail": f"Requisição com esta {HEADER} ainda está em processamento."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    replay = Response(record.response_body, status=record.status_code)
+    replay["Idempotent-Replayed"] = "true"
+    return replay
+
+
+def _expired(record):
+    """Resposta guardada há mais de ``IDEMPOTENCY_KEY_TTL`` ou processamento abandonado (worker morto na view)."""
+    ttl = settings.IDEMPOTENCY_KEY_TTL if record.status_code is not None else settings.IDEMPOTENCY_PENDING_TIMEOUT
+    return record.created_at < timezone.now() - timedelta(seconds=ttl)
+
+
+def _claim(lookup, request_hash):
+    """Retorna ``(registro, None)`` para executar a view ou ``(None, resposta)`` para devolver direto."""
+    record = IdempotencyKey.objects.filter(lookup=lookup).first()
+    if record is not None:
+        if not _expired(record):
+            return None, _replay(record, request_hash)
+        # Filtra de novo pelo estado lido: se outra requisição assumiu a chave no meio tempo, nada é apagado
+        # e o create abaixo cai no IntegrityError.
+        IdempotencyKey.objects.filter(
+            pk=record.pk, created_at=record.created_at, status_code=record.status_code
+        ).delete()
+
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(lookup=lookup, request_hash=request_hash), None
+    except IntegrityError:
+        # Outra requisição com a mesma chave chegou no meio tempo.
+        record = IdempotencyKey.objects.filter(lookup=lookup).first()
+        if record is None:
+            return _claim(lookup, request_hash)
+        return None, _replay(record, request_hash)
+
+
+def idempotent(handler):
+    """Guarda a resposta de um POST pela ``Idempotency-Key`` e a devolve nos retries, sem reexecutar a view."""
+
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"detail": f"{HEADER} muito longa."}, status=status.HTTP_400_BAD_REQUEST)
+
+        record, replay = _claim(_lookup(request, key), _request_hash(request))
+        if replay is not None:
+            return replay
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except APIException as exc:
+            response = self.handle_exception(exc)
+        except Exception:
+            record.delete()
+            raise
+
+        retryable = (status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS)
+        if response.status_code >= 500 or response.status_code in retryable:
+            record.delete()
+        else:
+            # update() e não save(): se a view passou de IDEMPOTENCY_PENDING_TIMEOUT, um retry pode já ter
+            # apagado o registro, e aí não há o que guardar.
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status_code=response.status_code, response_body=response.data
+            )
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    cutoff = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
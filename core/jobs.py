@@ -0,0 +1,47 @@
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from . import availability
+from .idempotency import purge_expired_keys
+from .models import Court
+from .scheduler import job
+from .stats import rebuild_player_stats
+from .sync import purge_change_log
+from .usage import purge_usage
+
+logger = logging.getLogger(__name__)
+
+
+@job("warm_next_day_availability", cron="*/30 * * * *")
+def warm_next_day_availability():
+    tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+    courts_by_club = {}
+    for club_id, court_id in (
+        Court.objects.exclude(status=Court.Status.MAINTENANCE).values_list("club_id", "id").order_by("club_id")
+    ):
+        courts_by_club.setdefault(club_id, []).append(court_id)
+    for club_id, court_ids in courts_by_club.items():
+        availability.warm_club(club_id, court_ids, tomorrow)
+    logger.info("Disponibilidade de %s aquecida para %d clube(s)", tomorrow, len(courts_by_club))
+
+
+@job("purge_idempotency_keys", cron="15 * * * *")
+def purge_idempotency_keys():
+    logger.info("%d Idempotency-Key(s) expirada(s) removida(s)", purge_expired_keys())
+
+
+@job("purge_change_log", cron="45 3 * * *")
+def purge_sync_change_log():
+    logger.info("%d entrada(s) antiga(s) do log de sync removida(s)", purge_change_log())
+
+
+@job("purge_club_usage", cron="50 3 * * *")
+def purge_club_usage():
+    logger.info("%d registro(s) antigo(s) de uso por clube removido(s)", purge_usage())
+
+
+@job("rebuild_player_stats", cron="30 3 * * *")
+def rebuild_all_player_stats():
+    logger.info("Estatísticas de %d jogador(es) recalculadas", rebuild_player_stats())
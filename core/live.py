@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBackend:
+    """Entrega os eventos somente aos assinantes deste processo.
+
+    Backends entre workers (ex.: Redis pub/sub) devem implementar a mesma
+    interface: ``publish`` envia a mensagem para todos os workers e cada
+    worker repassa o que receber para ``broadcaster.deliver``.
+    """
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def publish(self, club_id, message):
+        self.broadcaster.deliver(club_id, message)
+
+
+class Subscription:
+    def __init__(self, club_id, loop, max_queue):
+        self.club_id = club_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+
+    def put(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put_nowait, message)
+        except RuntimeError:
+            # Loop já encerrado: a conexão caiu antes do unsubscribe.
+            pass
+
+    def _put_nowait(self, message):
+        if self.queue.full():
+            # Cliente lento: descarta o evento mais antigo em vez de bloquear o publish.
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+
+
+class Broadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            backend_class = import_string(settings.LIVE_EVENTS_BACKEND)
+            self._backend = backend_class(self)
+        return self._backend
+
+    def subscribe(self, club_id):
+        subscription = Subscription(club_id, asyncio.get_running_loop(), settings.LIVE_EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[club_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.club_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.club_id]
+
+    def publish(self, club_id, event, data):
+        if club_id is None:
+            return
+        try:
+            self.backend.publish(club_id, {"event": event, "data": data})
+        except Exception:  # pragma: no cover - depende do backend configurado
+            logger.exception("Falha ao publicar evento %s do clube %s", event, club_id)
+
+    def deliver(self, club_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(club_id, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+
+broadcaster = Broadcaster()
+
+
+def format_event(event, data):
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def event_stream(club_id, snapshot):
+    subscription = broadcaster.subscribe(club_id)
+    try:
+        yield format_event("snapshot", snapshot)
+        while True:
+            try:
+                message = await subscription.get(settings.LIVE_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield format_event(message["event"], message["data"])
+    finally:
+        broadcaster.unsubscribe(subscription)
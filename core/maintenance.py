@@ -0,0 +1,124 @@
+from collections import defaultdict
+
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .models import Court, CourtMaintenanceWindow, Reservation
+from .signals import (
+    bump_availability_on_commit,
+    bump_calendars_on_commit,
+    publish_on_commit,
+    refresh_stats_on_commit,
+    reservation_payload,
+)
+from .sync import record_reservation_changes
+
+RESOLUTION_CANCEL = "cancel"
+RESOLUTION_MOVE = "move"
+
+
+def _overlaps(busy, start, end):
+    return any(busy_start < end and busy_end > start for busy_start, busy_end in busy)
+
+
+def _candidate_courts(court):
+    """Quadras livres do clube com o mesmo piso, primeiro as com a mesma cobertura."""
+    return list(
+        Court.objects.filter(club_id=court.club_id, surface=court.surface, status=Court.Status.AVAILABLE)
+        .exclude(pk=court.pk)
+        .annotate(
+            similarity=Case(When(covered=court.covered, then=Value(0)), default=Value(1), output_field=IntegerField())
+        )
+        .order_by("similarity", "name")
+    )
+
+
+def _busy_intervals(courts, start, end):
+    """Reservas e manutenções das quadras candidatas no período, em duas consultas."""
+    busy = defaultdict(list)
+    overlap = Q(court__in=courts, start_time__lt=end, end_time__gt=start)
+    reservations = Reservation.objects.filter(overlap).exclude(status=Reservation.Status.CANCELED)
+    for court_id, busy_start, busy_end in reservations.values_list("court_id", "start_time", "end_time"):
+        busy[court_id].append((busy_start, busy_end))
+    windows = CourtMaintenanceWindow.objects.filter(overlap)
+    for court_id, busy_start, busy_end in windows.values_list("court_id", "start_time", "end_time"):
+        busy[court_id].append((busy_start, busy_end))
+    return busy
+
+
+def resolve_conflicts(window, resolution=RESOLUTION_MOVE):
+    """Cancela ou move para quadras semelhantes as reservas que caem na janela de manutenção.
+
+    Deve rodar na mesma transação que cria a janela. As atualizações são em lote (sem signals),
+    então eventos ao vivo, disponibilidade, estatísticas, agendas e o log do sync são avisados aqui.
+    """
+    conflicts = list(
+        Reservation.objects.select_for_update()
+        .filter(court_id=window.court_id, start_time__lt=window.end_time, end_time__gt=window.start_time)
+        .exclude(status=Reservation.Status.CANCELED)
+        .order_by("start_time", "id")
+    )
+    if not conflicts:
+        return []
+
+    candidates = []
+    busy = {}
+    if resolution == RESOLUTION_MOVE:
+        candidates = _candidate_courts(window.court)
+        busy = _busy_intervals(
+            candidates,
+            min(reservation.start_time for reservation in conflicts),
+            max(reservation.end_time for reservation in conflicts),
+        )
+
+    report = []
+    moved = []
+    canceled = []
+    for reservation in conflicts:
+        entry = {
+            "reservation": reservation.pk,
+            "player": reservation.player_id,
+            "start_time": timezone.localtime(reservation.start_time),
+        }
+        target = next(
+            (
+                court
+                for court in candidates
+                if not _overlaps(busy[court.pk], reservation.start_time, reservation.end_time)
+            ),
+            None,
+        )
+        if target is not None:
+            busy[target.pk].append((reservation.start_time, reservation.end_time))
+            reservation.court = target
+            moved.append(reservation)
+            entry.update(status="moved", court=target.pk, court_name=target.name)
+        else:
+            reservation.status = Reservation.Status.CANCELED
+            canceled.append(reservation)
+            entry["status"] = "canceled"
+            if resolution == RESOLUTION_MOVE:
+                entry["detail"] = "Nenhuma quadra semelhante livre nesse horário."
+        report.append(entry)
+
+    now = timezone.now()
+    if moved:
+        for reservation in moved:
+            reservation.updated_at = now
+        Reservation.objects.bulk_update(moved, ["court", "updated_at"])
+    if canceled:
+        Reservation.objects.filter(pk__in=[reservation.pk for reservation in canceled]).update(
+            status=Reservation.Status.CANCELED, updated_at=now
+        )
+    record_reservation_changes(moved + canceled)
+
+    for reservation in moved:
+        publish_on_commit(reservation.club_id, "reservation.updated", reservation_payload(reservation))
+    for reservation in canceled:
+        publish_on_commit(reservation.club_id, "reservation.canceled", reservation_payload(reservation))
+    court_ids = {window.court_id, *(reservation.court_id for reservation in moved)}
+    player_ids = {reservation.player_id for reservation in conflicts}
+    bump_availability_on_commit(*court_ids)
+    refresh_stats_on_commit(*player_ids)
+    bump_calendars_on_commit(player_ids=player_ids, court_ids=court_ids)
+    return report
@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core.management.synthetic import create_synthetic_club
+from core.models import Court, Reservation
+from core.renderers import FastJSONRenderer
+from core.rows import court_rows, reservation_rows
+from core.serializers import CourtSerializer, ReservationSerializer
+
+
+class Command(BaseCommand):
+    help = "Compara linhas/s das listagens de reservas e quadras: serializer do DRF x caminho rápido (.values())."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Quantidade de reservas sintéticas.")
+        parser.add_argument("--repeat", type=int, default=5, help="Execuções por caminho (usa a melhor).")
+        parser.add_argument("--min-speedup", type=float, default=3.0, help="Ganho mínimo exigido nas reservas.")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        repeat = options["repeat"]
+
+        with transaction.atomic():
+            club = create_synthetic_club(rows)
+
+            def reservations():
+                return Reservation.objects.filter(club=club).select_related("court", "player", "coach")
+
+            def courts():
+                return Court.objects.filter(club=club)
+
+            results = {
+                "reservas": self._compare(
+                    lambda: JSONRenderer().render(ReservationSerializer(reservations(), many=True).data),
+                    lambda: FastJSONRenderer().render(reservation_rows(reservations())),
+                    rows,
+                    repeat,
+                ),
+                "quadras": self._compare(
+                    lambda: JSONRenderer().render(CourtSerializer(courts(), many=True).data),
+                    lambda: FastJSONRenderer().render(court_rows(courts())),
+                    courts().count(),
+                    repeat,
+                ),
+            }
+            transaction.set_rollback(True)
+
+        for name, (slow, fast) in results.items():
+            self.stdout.write(
+                f"{name}: serializer {slow:,.0f} linhas/s | rápido {fast:,.0f} linhas/s | ganho {fast / slow:.1f}x"
+            )
+
+        slow, fast = results["reservas"]
+        if fast / slow < options["min_speedup"]:
+            raise CommandError(f"Ganho de {fast / slow:.1f}x abaixo do mínimo de {options['min_speedup']}x.")
+
+    def _compare(self, slow_path, fast_path, count, repeat):
+        if slow_path() != fast_path():
+            raise CommandError("Os dois caminhos geraram JSON diferente.")
+        return count / self._best_time(slow_path, repeat), count / self._best_time(fast_path, repeat)
+
+    def _best_time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
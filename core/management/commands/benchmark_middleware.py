@@ -0,0 +1,83 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.management.synthetic import create_synthetic_club
+from core.models import ClubUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo por requisição da pilha de middleware completa (admin) e da do perfil api "
+        "(DJANGO_PROFILE=api), na mesma requisição autenticada por JWT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/me/", help="Caminho GET medido.")
+        parser.add_argument("--requests", type=int, default=5000, help="Requisições medidas em cada pilha.")
+
+    def handle(self, *args, **options):
+        if settings.API_PROFILE:
+            raise CommandError("Rode no perfil completo: ele tem as duas pilhas de middleware para comparar.")
+        if options["requests"] < 1:
+            raise CommandError("--requests precisa ser positivo.")
+
+        stacks = {
+            "completo": settings.MIDDLEWARE,
+            "api": [name for name in settings.MIDDLEWARE if name not in settings.ADMIN_ONLY_MIDDLEWARE],
+        }
+        with transaction.atomic():
+            club = create_synthetic_club(0, players=0, courts=1)
+            user = ClubUser.objects.create(username=f"bench-admin-{club.slug}@acebook.local", club=club, role="admin")
+            factory = RequestFactory(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+            handlers = {name: self._handler(middleware) for name, middleware in stacks.items()}
+
+            for name, handler in handlers.items():
+                response = handler.get_response(factory.get(options["path"]))
+                if response.status_code != 200:
+                    raise CommandError(f"{options['path']} respondeu {response.status_code} na pilha {name}.")
+
+            # As pilhas se alternam a cada requisição: variações da máquina afetam as duas igualmente.
+            timings, queries = self._measure(handlers, factory, options["path"], options["requests"])
+            transaction.set_rollback(True)
+
+        for name, middleware in stacks.items():
+            values = timings[name]
+            self.stdout.write(
+                f"{name:<9} {len(middleware):2d} middleware | média {statistics.fmean(values) * 1e6:7.1f} µs | "
+                f"p50 {statistics.median(values) * 1e6:7.1f} µs | {queries[name]:.1f} consulta(s)/req"
+            )
+        full, api = (statistics.median(timings[name]) for name in stacks)
+        self.stdout.write(f"Removido por requisição: {(full - api) * 1e6:.1f} µs ({(full - api) / full:.1%} da p50)")
+        for name in sorted(set(stacks["completo"]) - set(stacks["api"])):
+            self.stdout.write(f"  - {name}")
+
+    def _handler(self, middleware):
+        with override_settings(MIDDLEWARE=middleware):
+            handler = BaseHandler()
+            handler.load_middleware()
+        return handler
+
+    def _measure(self, handlers, factory, path, count):
+        executed = dict.fromkeys(handlers, 0)
+        timings = {name: [] for name in handlers}
+        current = None
+
+        def count_queries(execute, sql, params, many, context):
+            executed[current] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            for _ in range(count):
+                for current, handler in handlers.items():
+                    request = factory.get(path)
+                    started = time.perf_counter()
+                    handler.get_response(request)
+                    timings[current].append(time.perf_counter() - started)
+        return timings, {name: total / count for name, total in executed.items()}
@@ -0,0 +1,23 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import VERSION_KEY, generate_schema
+
+
+class Command(BaseCommand):
+    help = "Gera o schema OpenAPI em SCHEMA_FILE para o /schema/ servir sem introspectar as views."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--file", default=settings.SCHEMA_FILE, help="Destino (padrão: SCHEMA_FILE).")
+
+    def handle(self, *args, **options):
+        path = Path(options["file"])
+        schema = generate_schema()
+        path.write_text(json.dumps(schema, ensure_ascii=False, default=str))
+        paths = len(schema.get("paths", {}))
+        self.stdout.write(
+            self.style.SUCCESS(f"Schema com {paths} rotas salvo em {path} (versão {schema[VERSION_KEY]}).")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.management.synthetic import create_synthetic_club
+from core.middleware import brotli, compress
+from core.models import Court, Reservation
+from core.renderers import CompactJSONRenderer, FastJSONRenderer
+from core.rows import court_rows, reservation_rows
+
+
+class Command(BaseCommand):
+    help = "Mede os bytes trafegados nas listagens de reservas e quadras: JSON x compacto, com e sem compressão."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Quantidade de reservas sintéticas.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            club = create_synthetic_club(options["rows"])
+            payloads = {
+                "reservas": reservation_rows(Reservation.objects.filter(club=club)),
+                "quadras": court_rows(Court.objects.filter(club=club)),
+            }
+            transaction.set_rollback(True)
+
+        encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+        for name, rows in payloads.items():
+            self.stdout.write(f"{name} ({len(rows)} linhas)")
+            baseline = len(FastJSONRenderer().render(rows))
+            for label, renderer in (("json", FastJSONRenderer()), ("compact", CompactJSONRenderer())):
+                content = renderer.render(rows)
+                for encoding in encodings:
+                    size = len(content) if encoding == "identity" else len(compress(content, encoding))
+                    self.stdout.write(
+                        f"  {label:<8} {encoding:<9} {size:>10,} bytes  ({size / baseline:6.1%} do JSON original)"
+                    )
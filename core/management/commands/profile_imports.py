@@ -0,0 +1,75 @@
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+LOAD_URLCONF = "from django.urls import get_resolver; get_resolver().url_patterns"
+
+# Código executado no subprocesso para cada alvo.
+TARGETS = {
+    "setup": "import django; django.setup()",
+    "urls": f"import django; django.setup(); {LOAD_URLCONF}",
+    "wsgi": f"import {settings.WSGI_APPLICATION.rsplit('.', 1)[0]}; {LOAD_URLCONF}",
+}
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output):
+    """Linhas do ``-X importtime`` como ``(módulo, self_us, cumulative_us, nível)``."""
+    rows = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Mede o tempo de import de cada módulo no boot (python -X importtime em um subprocesso limpo)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            choices=sorted(TARGETS),
+            default="wsgi",
+            help="setup: django.setup(); urls: setup + URLconf; wsgi: app WSGI + URLconf (padrão).",
+        )
+        parser.add_argument("--limit", type=int, default=25, help="Quantos módulos listar.")
+        parser.add_argument("--sort", choices=("self", "cumulative"), default="self", help="Ordenação da lista.")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings")}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", TARGETS[options["target"]]],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        rows = parse_importtime(result.stderr)
+        if result.returncode != 0 or not rows:
+            errors = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+            raise CommandError(f"Falha ao importar o alvo {options['target']}:\n{errors}")
+
+        total_us = sum(self_us for _, self_us, _, _ in rows)
+        packages = defaultdict(int)
+        for module, self_us, _, _ in rows:
+            packages[module.split(".", 1)[0]] += self_us
+
+        self.stdout.write(f"Alvo {options['target']}: {len(rows)} módulos, {total_us / 1000:.1f} ms de import")
+        self.stdout.write("\nPor pacote (soma do tempo próprio):")
+        for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[: options["limit"]]:
+            self.stdout.write(f"  {package:<40} {self_us / 1000:8.1f} ms  {self_us / total_us:6.1%}")
+
+        column = 1 if options["sort"] == "self" else 2
+        self.stdout.write(f"\nPor módulo (ordenado por {options['sort']}):")
+        self.stdout.write(f"  {'módulo':<60} {'self':>9} {'cumulativo':>11}")
+        for row in sorted(rows, key=lambda row: row[column], reverse=True)[: options["limit"]]:
+            module, self_us, cumulative_us, _ = row
+            self.stdout.write(f"  {module:<60} {self_us / 1000:7.1f}ms {cumulative_us / 1000:9.1f}ms")
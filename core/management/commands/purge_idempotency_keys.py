@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from core.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Remove as Idempotency-Keys mais antigas que IDEMPOTENCY_KEY_TTL."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{purge_expired_keys()} chave(s) removida(s).")
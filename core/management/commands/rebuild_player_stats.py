@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import rebuild_player_stats
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero o resumo de estatísticas (PlayerStats) de todos os jogadores com reservas."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Estatísticas de {rebuild_player_stats()} jogador(es) recalculadas.")
@@ -0,0 +1,63 @@
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import jobs  # noqa: F401 - registra os jobs
+from core.models import ScheduledJob
+from core.scheduler import acquire_leadership, due_jobs, registry, release_leadership, run_job
+
+
+class Command(BaseCommand):
+    help = "Executa os jobs agendados (cron). Vários processos podem rodar; só o líder (lock no banco) executa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Executa os jobs devidos no minuto atual e sai.")
+        parser.add_argument("--run", metavar="JOB", help="Executa um job imediatamente, ignorando o cron.")
+        parser.add_argument("--list", action="store_true", help="Lista os jobs e as métricas de execução.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            return self._list()
+        if options["run"]:
+            scheduled_job = registry.get(options["run"])
+            if scheduled_job is None:
+                raise CommandError(f"Job desconhecido: {options['run']}")
+            duration_ms, ok = run_job(scheduled_job)
+            self.stdout.write(f"{scheduled_job.name}: {'ok' if ok else 'falhou'} em {duration_ms} ms")
+            return
+
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        try:
+            while True:
+                self._tick(owner)
+                if options["once"]:
+                    break
+                time.sleep(60 - time.time() % 60)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            release_leadership(owner)
+
+    def _tick(self, owner):
+        if not acquire_leadership(owner, settings.SCHEDULER_LOCK_TTL):
+            return
+        for scheduled_job in due_jobs(timezone.now()):
+            duration_ms, ok = run_job(scheduled_job)
+            self.stdout.write(f"{scheduled_job.name}: {'ok' if ok else 'falhou'} em {duration_ms} ms")
+
+    def _list(self):
+        metrics = {metric.name: metric for metric in ScheduledJob.objects.all()}
+        for name, scheduled_job in sorted(registry.items()):
+            metric = metrics.get(name)
+            if metric is None or not metric.runs:
+                self.stdout.write(f"{name} [{scheduled_job.schedule.expression}] nunca executado")
+                continue
+            average = metric.total_duration_ms / metric.runs
+            self.stdout.write(
+                f"{name} [{scheduled_job.schedule.expression}] execuções={metric.runs} falhas={metric.failures} "
+                f"última={metric.last_duration_ms} ms média={average:.0f} ms"
+            )
@@ -0,0 +1,213 @@
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler, get_internal_wsgi_application
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.audit import audit_buffer
+from core.booking import get_policy
+from core.management.synthetic import create_synthetic_club
+from core.models import ClubUser, Court, Reservation
+
+OUTCOME_ACCEPTED = "aceita"
+OUTCOME_OVERLAP = "sobreposição"
+OUTCOME_DAILY_LIMIT = "limite diário"
+OUTCOME_REJECTED = "outra recusa"
+OUTCOME_ERROR = "erro"
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def classify(status_code, body):
+    if status_code == 201:
+        return OUTCOME_ACCEPTED
+    if status_code != 400:
+        return OUTCOME_ERROR
+    text = json.dumps(body, ensure_ascii=False)
+    if "quadra nesse horário" in text:
+        return OUTCOME_OVERLAP
+    if "por dia" in text:
+        return OUTCOME_DAILY_LIMIT
+    return OUTCOME_REJECTED
+
+
+def find_violations(club_id):
+    """Sobreposições na mesma quadra e jogadores acima do limite diário, direto na tabela."""
+    violations = []
+    reservations = (
+        Reservation.objects.filter(club_id=club_id)
+        .exclude(status=Reservation.Status.CANCELED)
+        .order_by("court_id", "start_time")
+        .values_list("id", "court_id", "player_id", "start_time", "end_time")
+    )
+    previous = None
+    per_player_day = Counter()
+    for pk, court_id, player_id, start, end in reservations:
+        if previous is not None and previous[1] == court_id and start < previous[4]:
+            violations.append(f"Reservas {previous[0]} e {pk} se sobrepõem na quadra {court_id}.")
+        if previous is None or previous[1] != court_id or end > previous[4]:
+            previous = (pk, court_id, player_id, start, end)
+        per_player_day[player_id, timezone.localtime(start).date()] += 1
+
+    max_per_day = get_policy(club_id).max_per_day
+    if max_per_day is not None:
+        for (player_id, day), count in sorted(per_player_day.items()):
+            if count > max_per_day:
+                violations.append(f"Jogador {player_id} tem {count} reservas em {day} (limite {max_per_day}).")
+    return violations
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispara POST /api/reservations/ concorrentes em horários disputados e confere se nenhuma quadra "
+        "ficou com reservas sobrepostas nem jogador acima do limite diário."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=300, help="Total de POSTs.")
+        parser.add_argument("--workers", type=int, default=32, help="Threads disparando requisições.")
+        parser.add_argument("--players", type=int, default=40, help="Jogadores do clube sintético.")
+        parser.add_argument("--courts", type=int, default=3, help="Quadras do clube sintético.")
+        parser.add_argument("--slots", type=int, default=6, help="Inícios possíveis (a cada 30 min, reservas de 1h).")
+        parser.add_argument(
+            "--base-url",
+            help="Servidor já rodando com o mesmo banco (ex.: http://127.0.0.1:8000). "
+            "Sem ele, sobe um servidor WSGI com threads neste processo.",
+        )
+        parser.add_argument("--seed", type=int, help="Semente dos horários sorteados.")
+        parser.add_argument("--keep", action="store_true", help="Mantém o clube sintético no banco.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["workers"] < 1 or options["slots"] < 1:
+            raise CommandError("--requests, --workers e --slots precisam ser positivos.")
+
+        club = create_synthetic_club(0, players=options["players"], courts=options["courts"])
+        admin = ClubUser.objects.create(
+            username=f"stress-admin-{club.slug}@acebook.local", role=ClubUser.Roles.ADMIN, club=club
+        )
+        server = None
+        request_logger = logging.getLogger("django.request")
+        previous_level = request_logger.level
+        try:
+            base_url = options["base_url"]
+            if not base_url:
+                server = self._start_server()
+                base_url = f"http://127.0.0.1:{server.server_port}"
+            # Depois de subir o servidor (o wsgi reconfigura o logging): as recusas esperadas (400)
+            # não devem inundar o terminal com "Bad Request".
+            request_logger.setLevel(logging.ERROR)
+            payloads = self._payloads(club, options)
+            token = str(RefreshToken.for_user(admin).access_token)
+            outcomes, latencies, elapsed = self._fire(base_url.rstrip("/"), token, payloads, options["workers"])
+            violations = find_violations(club.pk)
+            stored = Reservation.objects.filter(club=club).count()
+        finally:
+            request_logger.setLevel(previous_level)
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            if not options["keep"]:
+                # Grava a auditoria pendente antes: depois do delete ela apontaria para um clube que não existe.
+                audit_buffer.flush()
+                club.delete()
+
+        self._report(outcomes, latencies, elapsed, stored)
+        if outcomes[OUTCOME_ACCEPTED] != stored:
+            violations.append(f"{outcomes[OUTCOME_ACCEPTED]} reservas aceitas, mas {stored} gravadas.")
+        if violations:
+            for violation in violations:
+                self.stderr.write(f"  {violation}")
+            raise CommandError(f"{len(violations)} invariante(s) violado(s).")
+        self.stdout.write(self.style.SUCCESS("Invariantes OK: nenhuma sobreposição nem jogador acima do limite diário."))
+
+    def _start_server(self):
+        server = ThreadedWSGIServer(("127.0.0.1", 0), QuietRequestHandler, allow_reuse_address=False)
+        server.set_app(get_internal_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _payloads(self, club, options):
+        """Admin reservando para jogadores amanhã: poucos horários e jogadores repetidos geram disputa."""
+        rng = random.Random(options["seed"])
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        first_start = timezone.make_aware(datetime.combine(tomorrow, datetime.min.time()).replace(hour=8))
+        courts = list(Court.objects.filter(club=club).values_list("id", flat=True))
+        players = list(ClubUser.objects.filter(club=club, role=ClubUser.Roles.PLAYER).values_list("id", flat=True))
+        payloads = []
+        for _ in range(options["requests"]):
+            start = first_start + timedelta(minutes=30 * rng.randrange(options["slots"]))
+            payloads.append(
+                {
+                    "court": rng.choice(courts),
+                    "player": rng.choice(players),
+                    "start_time": start.isoformat(),
+                    "end_time": (start + timedelta(hours=1)).isoformat(),
+                }
+            )
+        return payloads
+
+    def _fire(self, base_url, token, payloads, workers):
+        url = f"{base_url}/api/reservations/"
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+        def post(payload):
+            request = urllib.request.Request(url, data=json.dumps(payload).encode(), headers=headers, method="POST")
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    status_code, body = response.status, response.read()
+            except urllib.error.HTTPError as exc:
+                status_code, body = exc.code, exc.read()
+            except OSError as exc:
+                return OUTCOME_ERROR, time.perf_counter() - started, str(exc)
+            latency = time.perf_counter() - started
+            try:
+                body = json.loads(body)
+            except ValueError:
+                body = body.decode(errors="replace")
+            return classify(status_code, body), latency, body
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(post, payloads))
+        elapsed = time.perf_counter() - started
+
+        outcomes = Counter(outcome for outcome, _, _ in results)
+        latencies = [latency for _, latency, _ in results]
+        errors = defaultdict(int)
+        for outcome, _, body in results:
+            if outcome in {OUTCOME_ERROR, OUTCOME_REJECTED}:
+                errors[str(body)[:200]] += 1
+        for body, count in sorted(errors.items(), key=lambda item: -item[1])[:5]:
+            self.stderr.write(f"  {count}x {body}")
+        return outcomes, latencies, elapsed
+
+    def _report(self, outcomes, latencies, elapsed, stored):
+        total = sum(outcomes.values())
+        conflicts = outcomes[OUTCOME_OVERLAP] + outcomes[OUTCOME_DAILY_LIMIT]
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(f"{total} requisições em {elapsed:.2f}s: {total / elapsed:,.1f} req/s")
+        self.stdout.write(
+            f"Latência: p50 {percentiles[49] * 1000:.0f} ms | p95 {percentiles[94] * 1000:.0f} ms | "
+            f"máx {max(latencies) * 1000:.0f} ms"
+        )
+        for outcome in (OUTCOME_ACCEPTED, OUTCOME_OVERLAP, OUTCOME_DAILY_LIMIT, OUTCOME_REJECTED, OUTCOME_ERROR):
+            self.stdout.write(f"  {outcome:<15} {outcomes[outcome]:6d}  {outcomes[outcome] / total:6.1%}")
+        decided = outcomes[OUTCOME_ACCEPTED] + conflicts
+        if decided:
+            self.stdout.write(f"Conflitos por reserva aceita: {conflicts / max(outcomes[OUTCOME_ACCEPTED], 1):.2f}")
+        self.stdout.write(f"Reservas gravadas: {stored}")
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from core.models import Club, ClubUser, Coach, Court, Reservation
+
+
+def create_synthetic_club(reservations, players=50, courts=20):
+    """Cria um clube com jogadores, quadras e reservas via bulk_create (sem signals)."""
+    club = Club.objects.create(name=f"Benchmark {time.time_ns()}", slug=f"benchmark-{time.time_ns()}")
+    club_players = ClubUser.objects.bulk_create(
+        ClubUser(
+            username=f"bench-{club.slug}-{index}@acebook.local",
+            email=f"bench-{club.slug}-{index}@acebook.local",
+            first_name="Jogador",
+            last_name=str(index),
+            club=club,
+        )
+        for index in range(players)
+    )
+    club_courts = Court.objects.bulk_create(
+        Court(club=club, name=f"Quadra {index}", surface=Court.Surface.SAIBRO) for index in range(courts)
+    )
+    coaches = Coach.objects.bulk_create(Coach(club=club, name=f"Coach {index}", phone="0") for index in range(5))
+    start = timezone.now()
+    Reservation.objects.bulk_create(
+        Reservation(
+            club=club,
+            court=club_courts[index % len(club_courts)],
+            player=club_players[index % len(club_players)],
+            coach=coaches[index % len(coaches)] if index % 2 else None,
+            start_time=start + timedelta(hours=index),
+            end_time=start + timedelta(hours=index + 1),
+            type=Reservation.Type.values[index % len(Reservation.Type.values)],
+        )
+        for index in range(reservations)
+    )
+    return club
@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .passwords import PASSWORD_REQUIREMENTS, hash_passwords, password_is_strong, password_reset_token
+from .signals import invalidate_search_on_commit
+
+User = get_user_model()
+
+MODE_INVITE = "invite"
+MODE_PASSWORD = "password"
+
+# Campos lidos de cada linha; no JSON podem chegar números, listas etc.
+TEXT_FIELDS = ("email", "password", "name")
+
+# O email vira também o username; um valor maior que a coluna derrubaria o bulk_create do lote inteiro.
+USERNAME_MAX_LENGTH = User._meta.get_field("username").max_length
+FIRST_NAME_MAX_LENGTH = User._meta.get_field("first_name").max_length
+LAST_NAME_MAX_LENGTH = User._meta.get_field("last_name").max_length
+
+
+def _text(row, field):
+    value = row.get(field)
+    return value if isinstance(value, str) else ""
+
+
+def _existing_identifiers(emails):
+    existing = set()
+    rows = (
+        User.objects.annotate(email_lower=Lower("email"))
+        .filter(Q(email_lower__in=emails) | Q(username__in=emails))
+        .values_list("email_lower", "username")
+    )
+    for email, username in rows:
+        existing.add(email)
+        existing.add(username)
+    return existing
+
+
+def import_members(club, rows, mode=MODE_INVITE):
+    """Cria jogadores em lote para o clube e devolve o relatório por linha.
+
+    ``mode=password`` usa a senha de cada linha (hash em paralelo);
+    ``mode=invite`` cria a conta sem senha e devolve um link de definição
+    de senha, no mesmo formato do fluxo de "esqueci senha".
+    """
+    emails = [_text(row, "email").strip().lower() for row in rows]
+    existing = _existing_identifiers([email for email in emails if email])
+
+    report = []
+    pending = []
+    passwords = []
+    seen = set()
+    for index, (row, email) in enumerate(zip(rows, emails), start=1):
+        entry = {"row": index, "email": email, "status": "error"}
+        report.append(entry)
+        invalid = [field for field in TEXT_FIELDS if row.get(field) is not None and not isinstance(row[field], str)]
+        if invalid:
+            entry["detail"] = f"Informe {', '.join(invalid)} como texto."
+            continue
+        if not email:
+            entry["detail"] = "Informe o email."
+            continue
+        if len(email) > USERNAME_MAX_LENGTH:
+            entry["detail"] = f"Email com mais de {USERNAME_MAX_LENGTH} caracteres."
+            continue
+        try:
+            validate_email(email)
+        except ValidationError:
+            entry["detail"] = "Email inválido."
+            continue
+        if email in seen:
+            entry["status"] = "skipped"
+            entry["detail"] = "Email repetido no arquivo."
+            continue
+        if email in existing:
+            entry["status"] = "skipped"
+            entry["detail"] = "Email já cadastrado."
+            continue
+        password = _text(row, "password")
+        if mode == MODE_PASSWORD and not password_is_strong(password):
+            entry["detail"] = PASSWORD_REQUIREMENTS
+            continue
+
+        parts = _text(row, "name").split()
+        first_name, last_name = (parts[0], " ".join(parts[1:])) if parts else ("", "")
+        if len(first_name) > FIRST_NAME_MAX_LENGTH or len(last_name) > LAST_NAME_MAX_LENGTH:
+            entry["detail"] = "Nome muito longo."
+            continue
+
+        seen.add(email)
+        user = User(
+            username=email,
+            email=email,
+            role=User.Roles.PLAYER,
+            club=club,
+            first_name=first_name,
+            last_name=last_name,
+        )
+        pending.append((entry, user))
+        passwords.append(password)
+
+    if mode == MODE_PASSWORD:
+        hashed_passwords = hash_passwords(passwords)
+    else:
+        hashed_passwords = [make_password(None) for _ in pending]
+    for (_, user), hashed in zip(pending, hashed_passwords):
+        user.password = hashed
+
+    with transaction.atomic():
+        User.objects.bulk_create([user for _, user in pending], batch_size=settings.BULK_IMPORT_BATCH_SIZE)
+        invalidate_search_on_commit(club.pk)
+
+    for entry, user in pending:
+        entry["status"] = "created"
+        entry["id"] = user.pk
+        if mode == MODE_INVITE:
+            uid = urlsafe_base64_encode(force_bytes(user.pk))
+            token = password_reset_token.make_token(user)
+            entry["invite_link"] = f"{settings.FRONTEND_RESET_URL}?uid={uid}&token={token}"
+    return report
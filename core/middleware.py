@@ -0,0 +1,76 @@
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+re_encoding = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$")
+
+
+def accepted_encodings(header):
+    encodings = {}
+    for part in header.split(","):
+        match = re_encoding.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        encodings[match.group(1).lower()] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    """Codificação aceita com o maior q; no empate, brotli antes de gzip."""
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get("*", 0)
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    # max() fica com o primeiro entre os empatados, então a ordem de available decide o empate.
+    encoding = max(available, key=lambda name: encodings.get(name, wildcard))
+    return encoding if encodings.get(encoding, wildcard) > 0 else None
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return compress_string(content, max_random_bytes=100)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compressão gzip/brotli negociada pelo ``Accept-Encoding``.
+
+    Respostas menores que ``COMPRESSION_MIN_SIZE`` e respostas em streaming
+    (ex.: o SSE de ``/api/clubs/live/``, que precisa de flush imediato) saem
+    sem compressão.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        compressed_content = compress(response.content, encoding)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(compressed_content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_alter_reservation_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='coach',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations', to='core.coach'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['coach', 'start_time'], name='reservation_coach_start_idx'),
+        ),
+    ]
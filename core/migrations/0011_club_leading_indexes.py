@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0010_scheduler'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clubuser',
+            index=models.Index(fields=['club', 'username'], name='clubuser_club_username_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coach',
+            index=models.Index(fields=['club', 'name'], name='coach_club_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['club', 'start_time'], name='reservation_club_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['club', 'court', 'start_time'], name='reservation_club_court_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_club_leading_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_reservations', models.PositiveIntegerField(default=0)),
+                ('canceled_reservations', models.PositiveIntegerField(default=0)),
+                ('training_reservations', models.PositiveIntegerField(default=0)),
+                ('recreational_reservations', models.PositiveIntegerField(default=0)),
+                ('tournament_reservations', models.PositiveIntegerField(default=0)),
+                ('performance_reservations', models.PositiveIntegerField(default=0)),
+                ('last_reservation_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_stats', to='core.club')),
+                ('favourite_court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.court')),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['club', '-total_reservations'], name='playerstats_club_total_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_calendarfeed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['start_time', 'id'], name='reservation_start_id_idx'),
+        ),
+    ]
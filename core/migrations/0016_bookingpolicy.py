@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_courtmaintenancewindow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_per_day', models.PositiveSmallIntegerField(blank=True, default=1, null=True)),
+                ('max_per_week', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('player_advance_days', models.PositiveSmallIntegerField(blank=True, default=0, null=True)),
+                ('max_duration_minutes', models.PositiveIntegerField(blank=True, null=True)),
+                ('peak_starts_at', models.TimeField(blank=True, null=True)),
+                ('peak_ends_at', models.TimeField(blank=True, null=True)),
+                ('peak_weekly_quotas', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('club', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='booking_policy', to='core.club')),
+            ],
+        ),
+    ]
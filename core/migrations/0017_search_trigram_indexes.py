@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Índices GIN de trigramas para /api/search/. Só existem no PostgreSQL; no SQLite a busca usa o
+# índice em memória de core.search. upper(coluna) cobre tanto o ILIKE do __icontains quanto o %>.
+TRIGRAM_INDEXES = (
+    ("clubuser_first_name_trgm_idx", "core_clubuser", "first_name"),
+    ("clubuser_last_name_trgm_idx", "core_clubuser", "last_name"),
+    ("clubuser_username_trgm_idx", "core_clubuser", "username"),
+    ("clubuser_email_trgm_idx", "core_clubuser", "email"),
+    ("coach_name_trgm_idx", "core_coach", "name"),
+    ("court_name_trgm_idx", "core_court", "name"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin (upper({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação e não bloqueia escrita na tabela.
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_bookingpolicy'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
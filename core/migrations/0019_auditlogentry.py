@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:29
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_sync_changelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor_name', models.CharField(blank=True, max_length=150)),
+                ('kind', models.CharField(choices=[('court', 'Quadra'), ('coach', 'Coach'), ('reservation', 'Reserva'), ('member', 'Membro')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('create', 'Criação'), ('update', 'Alteração'), ('delete', 'Remoção')], max_length=10)),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_log', to='core.club')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['club', '-created_at', '-id'], name='audit_club_created_idx'), models.Index(fields=['club', 'kind', 'object_id', '-created_at'], name='audit_club_object_idx'), models.Index(fields=['club', 'actor', '-created_at'], name='audit_club_actor_idx')],
+            },
+        ),
+    ]
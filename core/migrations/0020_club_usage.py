@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 00:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_auditlogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='hourly_hard_quota',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='hourly_soft_quota',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ClubUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateTimeField()),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('throttled', models.PositiveIntegerField(default=0)),
+                ('queries', models.PositiveBigIntegerField(default=0)),
+                ('db_time_ms', models.PositiveBigIntegerField(default=0)),
+                ('rows', models.PositiveBigIntegerField(default=0)),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage', to='core.club')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period'], name='clubusage_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('club', 'period'), name='clubusage_club_period_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Busca do admin por início do email (username__istartswith): o PostgreSQL compara UPPER(username)
+# com LIKE 'PREFIXO%', que só usa um índice na mesma expressão com text_pattern_ops. No SQLite o LIKE
+# já ignora maiúsculas e não há o que criar.
+INDEX_NAME = "clubuser_username_upper_idx"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} ON core_clubuser (upper(username) text_pattern_ops)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação e não bloqueia escrita na tabela.
+    atomic = False
+
+    dependencies = [
+        ('core', '0020_club_usage'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
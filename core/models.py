@@ -1,10 +1,20 @@
-from django.contrib.auth.models import AbstractUser
+import secrets
+
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
+
+from .tenancy import ClubScopedManager
 
 
 class Club(models.Model):
     name = models.CharField(max_length=150, unique=True)
     slug = models.SlugField(unique=True)
+    # Requisições por hora à API: acima da cota leve o clube é sinalizado, acima da rígida recebe 429.
+    # Vazio usa CLUB_HOURLY_SOFT_QUOTA / CLUB_HOURLY_HARD_QUOTA; 0 desliga a cota.
+    hourly_soft_quota = models.PositiveIntegerField(null=True, blank=True)
+    hourly_hard_quota = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self) -> str:
         return self.name
@@ -18,6 +28,14 @@ class ClubUser(AbstractUser):
     role = models.CharField(max_length=10, choices=Roles.choices, default=Roles.PLAYER)
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="users", null=True, blank=True)
 
+    objects = UserManager()
+    scoped = ClubScopedManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=("club", "username"), name="clubuser_club_username_idx"),
+        ]
+
     @property
     def club_name(self) -> str:
         return self.club.name if self.club else ""
@@ -30,8 +48,14 @@ class Coach(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = models.Manager()
+    scoped = ClubScopedManager()
+
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=("club", "name"), name="coach_club_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -54,6 +78,10 @@ class Court(models.Model):
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.AVAILABLE)
     opens_at = models.TimeField(default="06:00")
     closes_at = models.TimeField(default="22:00")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    scoped = ClubScopedManager()
 
     class Meta:
         unique_together = ("club", "name")
@@ -76,16 +104,256 @@ class Reservation(models.Model):
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="reservations")
     court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name="reservations")
     player = models.ForeignKey(ClubUser, on_delete=models.CASCADE, related_name="reservations")
+    coach = models.ForeignKey(
+        Coach,
+        on_delete=models.SET_NULL,
+        related_name="reservations",
+        null=True,
+        blank=True,
+    )
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.APPROVED)
     type = models.CharField(max_length=20, choices=Type.choices, default=Type.TRAINING)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    scoped = ClubScopedManager()
 
     class Meta:
         ordering = ("-start_time",)
         constraints = [
             models.CheckConstraint(check=models.Q(end_time__gt=models.F("start_time")), name="reservation_end_gt_start"),
         ]
+        indexes = [
+            models.Index(fields=("coach", "start_time"), name="reservation_coach_start_idx"),
+            models.Index(fields=("club", "start_time"), name="reservation_club_start_idx"),
+            models.Index(fields=("club", "court", "start_time"), name="reservation_club_court_idx"),
+            # Ordem padrão do admin (-start_time, -id) sem ordenar a tabela inteira.
+            models.Index(fields=("start_time", "id"), name="reservation_start_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.court.name} - {self.start_time:%d/%m %H:%M}"
+
+
+class BookingPolicy(models.Model):
+    """Regras de reserva do clube; campos vazios desligam o limite. Sem registro valem os padrões."""
+
+    club = models.OneToOneField(Club, on_delete=models.CASCADE, related_name="booking_policy")
+    max_per_day = models.PositiveSmallIntegerField(null=True, blank=True, default=1)
+    max_per_week = models.PositiveSmallIntegerField(null=True, blank=True)
+    player_advance_days = models.PositiveSmallIntegerField(null=True, blank=True, default=0)
+    max_duration_minutes = models.PositiveIntegerField(null=True, blank=True)
+    peak_starts_at = models.TimeField(null=True, blank=True)
+    peak_ends_at = models.TimeField(null=True, blank=True)
+    peak_weekly_quotas = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Política de {self.club}"
+
+
+class CourtMaintenanceWindow(models.Model):
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="maintenance_windows")
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name="maintenance_windows")
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    reason = models.CharField(max_length=200, blank=True)
+    created_by = models.ForeignKey(ClubUser, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+    scoped = ClubScopedManager()
+
+    class Meta:
+        ordering = ("start_time",)
+        constraints = [
+            models.CheckConstraint(check=models.Q(end_time__gt=models.F("start_time")), name="maintenance_end_gt_start"),
+        ]
+        indexes = [
+            models.Index(fields=("court", "start_time"), name="maintenance_court_start_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.court.name} - {self.start_time:%d/%m %H:%M} a {self.end_time:%d/%m %H:%M}"
+
+
+class ChangeLogEntry(models.Model):
+    """Uma alteração de quadra, coach ou reserva; o id é o número de sequência do /api/sync/."""
+
+    class Kind(models.TextChoices):
+        COURT = "court", "Quadra"
+        COACH = "coach", "Coach"
+        RESERVATION = "reservation", "Reserva"
+
+    class Action(models.TextChoices):
+        UPSERT = "upsert", "Criado ou alterado"
+        DELETE = "delete", "Removido"
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="change_log")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    # Jogador da reserva (antes ou depois da alteração), para o sync de cada jogador; sem FK no banco
+    # para a entrada sobreviver à remoção do usuário.
+    player = models.ForeignKey(
+        ClubUser, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+", null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("club", "id"), name="changelog_club_seq_idx"),
+            models.Index(fields=("created_at",), name="changelog_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.kind} {self.object_id} {self.action}"
+
+
+class AuditLogEntry(models.Model):
+    """Alteração feita por um usuário pela API, com os valores de cada campo antes e depois."""
+
+    class Kind(models.TextChoices):
+        COURT = "court", "Quadra"
+        COACH = "coach", "Coach"
+        RESERVATION = "reservation", "Reserva"
+        MEMBER = "member", "Membro"
+
+    class Action(models.TextChoices):
+        CREATE = "create", "Criação"
+        UPDATE = "update", "Alteração"
+        DELETE = "delete", "Remoção"
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="audit_log")
+    # Sem FK no banco: o registro continua válido depois que o usuário é removido.
+    actor = models.ForeignKey(
+        ClubUser, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+", null=True, blank=True
+    )
+    actor_name = models.CharField(max_length=150, blank=True)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # Momento da alteração; as entradas são gravadas em lote depois.
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("club", "-created_at", "-id"), name="audit_club_created_idx"),
+            models.Index(fields=("club", "kind", "object_id", "-created_at"), name="audit_club_object_idx"),
+            models.Index(fields=("club", "actor", "-created_at"), name="audit_club_actor_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.actor_name}: {self.action} {self.kind} {self.object_id}"
+
+
+class ClubUsage(models.Model):
+    """Uso da API pelo clube em uma hora, somando o que cada worker acumulou em memória."""
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="usage")
+    # Início da hora (UTC)
+    period = models.DateTimeField()
+    requests = models.PositiveIntegerField(default=0)
+    throttled = models.PositiveIntegerField(default=0)
+    queries = models.PositiveBigIntegerField(default=0)
+    db_time_ms = models.PositiveBigIntegerField(default=0)
+    # Linhas lidas ou alteradas, quando o driver informa (o SQLite não conta as de SELECT)
+    rows = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("club", "period"), name="clubusage_club_period_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=("period",), name="clubusage_period_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.club_id} {self.period:%Y-%m-%d %H:%M}: {self.requests}"
+
+
+class IdempotencyKey(models.Model):
+    lookup = models.CharField(max_length=64, unique=True)
+    request_hash = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return self.lookup
+
+
+class SchedulerLock(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    owner = models.CharField(max_length=200)
+    expires_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.owner})"
+
+
+class ScheduledJob(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    runs = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.PositiveIntegerField(null=True, blank=True)
+    total_duration_ms = models.PositiveBigIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ("name",)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class PlayerStats(models.Model):
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="player_stats")
+    player = models.OneToOneField(ClubUser, on_delete=models.CASCADE, related_name="stats")
+    total_reservations = models.PositiveIntegerField(default=0)
+    canceled_reservations = models.PositiveIntegerField(default=0)
+    training_reservations = models.PositiveIntegerField(default=0)
+    recreational_reservations = models.PositiveIntegerField(default=0)
+    tournament_reservations = models.PositiveIntegerField(default=0)
+    performance_reservations = models.PositiveIntegerField(default=0)
+    favourite_court = models.ForeignKey(Court, on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    last_reservation_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = models.Manager()
+    scoped = ClubScopedManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=("club", "-total_reservations"), name="playerstats_club_total_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.player} ({self.total_reservations})"
+
+
+def generate_calendar_token():
+    return secrets.token_urlsafe(24)
+
+
+class CalendarFeed(models.Model):
+    class Kind(models.TextChoices):
+        PLAYER = "player", "Jogador"
+        COURT = "court", "Quadra"
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="calendar_feeds")
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    player = models.OneToOneField(
+        ClubUser, on_delete=models.CASCADE, related_name="calendar_feed", null=True, blank=True
+    )
+    court = models.OneToOneField(Court, on_delete=models.CASCADE, related_name="calendar_feed", null=True, blank=True)
+    token = models.CharField(max_length=64, unique=True, default=generate_calendar_token)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} {self.player_id or self.court_id}"
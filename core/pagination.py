@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class LeaderboardPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    # Posição calculada por window function: o cursor filtra por ela e o rank continua global.
+    ordering = "position"
+
+
+class AuditLogPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "-id")
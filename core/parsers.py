@@ -0,0 +1,21 @@
+import csv
+import io
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def read_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    return [{(key or "").strip().lower(): (value or "").strip() for key, value in row.items()} for row in reader]
+
+
+class CSVParser(BaseParser):
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        try:
+            return read_csv(stream.read().decode(encoding).lstrip("\ufeff"))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ParseError(f"CSV inválido: {exc}")
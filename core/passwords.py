@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+
+# Sem imports de models no topo: este módulo também é importado pelos
+# processos filhos (spawn) do hash em paralelo antes do django.setup().
+
+password_reset_token = PasswordResetTokenGenerator()
+PASSWORD_REQUIREMENTS = "A senha deve ter pelo menos 8 caracteres e conter letras e números."
+
+
+def password_is_strong(password: str | None) -> bool:
+    if not password or len(password) < 8:
+        return False
+    has_letter = any(char.isalpha() for char in password)
+    has_digit = any(char.isdigit() for char in password)
+    return has_letter and has_digit
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+
+    django.setup()
+
+
+def _hash_chunk(passwords):
+    from django.contrib.auth.hashers import make_password
+
+    return [make_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers=None, chunk_size=25):
+    """Gera os hashes em paralelo num pool de processos; listas pequenas são feitas no próprio processo."""
+    from django.conf import settings
+
+    workers = workers or settings.BULK_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+    if workers <= 1 or len(passwords) <= chunk_size:
+        return _hash_chunk(passwords)
+
+    chunks = [passwords[start : start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+    # spawn em vez de fork: o filho não herda as conexões abertas com o banco.
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings"),),
+    ) as pool:
+        return [hashed for chunk in pool.map(_hash_chunk, chunks) for hashed in chunk]
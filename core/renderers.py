@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Mesmo JSON do ``JSONRenderer`` do DRF, gerado pelo orjson quando disponível."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        ret = orjson.dumps(data, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class CompactJSONRenderer(FastJSONRenderer):
+    """Listas em colunas (``?format=compact``): cada campo vira um array, sem repetir as chaves por linha."""
+
+    format = "compact"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+            fields = list(data[0]) if data else []
+            data = {
+                "count": len(data),
+                "columns": {field: [row.get(field) for row in data] for field in fields},
+            }
+        return super().render(data, accepted_media_type, renderer_context)
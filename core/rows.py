@@ -0,0 +1,141 @@
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
+from django.utils import timezone
+
+# Caminho rápido de leitura para as listagens: mesmas chaves e formatos do
+# ReservationSerializer/CourtSerializer, mas montado com .values() e sem
+# instanciar models nem campos de serializer por linha.
+
+COURT_FIELDS = (
+    "id",
+    "name",
+    "surface",
+    "covered",
+    "lights",
+    "status",
+    "opens_at",
+    "closes_at",
+)
+
+COACH_FIELDS = ("id", "name", "phone")
+
+RESERVATION_FIELDS = (
+    "id",
+    "court_id",
+    "court_name",
+    "player_id",
+    "player_name",
+    "coach_id",
+    "coach_name",
+    "start_time",
+    "end_time",
+    "status",
+    "type",
+)
+
+
+def format_datetime(value, tz):
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(tz)
+    else:
+        value = timezone.make_aware(value, tz)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def format_time(value):
+    return value.isoformat() if value is not None else None
+
+
+def player_name_expression(prefix="player__"):
+    full_name = Concat(
+        F(f"{prefix}first_name"),
+        Value(" "),
+        F(f"{prefix}last_name"),
+        output_field=CharField(),
+    )
+    return Coalesce(
+        NullIf(Trim(full_name), Value("")),
+        NullIf(F(f"{prefix}username"), Value("")),
+        F(f"{prefix}email"),
+        output_field=CharField(),
+    )
+
+
+def reservation_rows(queryset, include_updated_at=False):
+    rows = queryset.annotate(
+        court_name=F("court__name"),
+        player_name=player_name_expression(),
+        coach_name=F("coach__name"),
+    ).values_list(*RESERVATION_FIELDS, *(("updated_at",) if include_updated_at else ()))
+    tz = timezone.get_current_timezone()
+    result = [
+        {
+            "id": pk,
+            "court": court_id,
+            "court_name": court_name,
+            "player": player_id,
+            "player_name": player_name,
+            "coach": coach_id,
+            "coach_name": coach_name,
+            "start_time": format_datetime(start_time, tz),
+            "end_time": format_datetime(end_time, tz),
+            "status": reservation_status,
+            "type": reservation_type,
+        }
+        for (
+            pk,
+            court_id,
+            court_name,
+            player_id,
+            player_name,
+            coach_id,
+            coach_name,
+            start_time,
+            end_time,
+            reservation_status,
+            reservation_type,
+            *_,
+        ) in rows
+    ]
+    if include_updated_at:
+        _add_updated_at(result, rows, tz)
+    return result
+
+
+def court_rows(queryset, include_updated_at=False):
+    rows = queryset.values_list(*COURT_FIELDS, *(("updated_at",) if include_updated_at else ()))
+    result = [
+        {
+            "id": pk,
+            "name": name,
+            "surface": surface,
+            "covered": covered,
+            "lights": lights,
+            "status": court_status,
+            "opens_at": format_time(opens_at),
+            "closes_at": format_time(closes_at),
+        }
+        for pk, name, surface, covered, lights, court_status, opens_at, closes_at, *_ in rows
+    ]
+    if include_updated_at:
+        _add_updated_at(result, rows, timezone.get_current_timezone())
+    return result
+
+
+def coach_rows(queryset, include_updated_at=False):
+    rows = queryset.values_list(*COACH_FIELDS, *(("updated_at",) if include_updated_at else ()))
+    result = [{"id": pk, "name": name, "phone": phone} for pk, name, phone, *_ in rows]
+    if include_updated_at:
+        _add_updated_at(result, rows, timezone.get_current_timezone())
+    return result
+
+
+def _add_updated_at(result, rows, tz):
+    # updated_at é sempre a última coluna; usado pelo /api/sync/.
+    for item, row in zip(result, rows):
+        item["updated_at"] = format_datetime(row[-1], tz)
@@ -0,0 +1,138 @@
+import logging
+import time
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ScheduledJob, SchedulerLock
+
+logger = logging.getLogger(__name__)
+
+LEADER_LOCK = "scheduler"
+
+# (mínimo, máximo) de cada campo: minuto, hora, dia do mês, mês, dia da semana (0 = domingo).
+CRON_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def parse_cron_field(expression, minimum, maximum):
+    values = set()
+    for part in expression.split(","):
+        step = 1
+        if "/" in part:
+            part, raw_step = part.split("/", 1)
+            step = int(raw_step)
+        if part == "*":
+            start, end = minimum, maximum
+        elif "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if start < minimum or end > maximum or start > end or step < 1:
+            raise ValueError(f"Campo cron inválido: {expression}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """Subconjunto do cron: ``*``, listas, intervalos e passos, no fuso de ``TIME_ZONE``."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expressão cron deve ter 5 campos: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            parse_cron_field(field, minimum, maximum) for field, (minimum, maximum) in zip(fields, CRON_FIELDS)
+        )
+
+    def matches(self, moment):
+        moment = timezone.localtime(moment)
+        return (
+            moment.minute in self.minutes
+            and moment.hour in self.hours
+            and moment.day in self.days
+            and moment.month in self.months
+            and (moment.isoweekday() % 7) in self.weekdays
+        )
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    schedule: CronSchedule
+    func: object
+
+
+registry = {}
+
+
+def job(name, cron):
+    """Registra a função como job do ``run_scheduler``."""
+
+    def decorator(func):
+        registry[name] = Job(name=name, schedule=CronSchedule(cron), func=func)
+        return func
+
+    return decorator
+
+
+def acquire_leadership(owner, ttl):
+    """Renova ou assume o lock de líder; só um processo ``run_scheduler`` executa os jobs."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+    renewed = SchedulerLock.objects.filter(
+        Q(owner=owner) | Q(expires_at__lt=now),
+        name=LEADER_LOCK,
+    ).update(owner=owner, expires_at=expires_at)
+    if renewed:
+        return True
+    try:
+        with transaction.atomic():
+            SchedulerLock.objects.create(name=LEADER_LOCK, owner=owner, expires_at=expires_at)
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_leadership(owner):
+    SchedulerLock.objects.filter(name=LEADER_LOCK, owner=owner).delete()
+
+
+def run_job(scheduled_job):
+    started_at = timezone.now()
+    ScheduledJob.objects.get_or_create(name=scheduled_job.name)
+    ScheduledJob.objects.filter(name=scheduled_job.name).update(last_started_at=started_at)
+    started = time.perf_counter()
+    error = ""
+    try:
+        scheduled_job.func()
+    except Exception:
+        logger.exception("Job %s falhou", scheduled_job.name)
+        error = traceback.format_exc()
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    ScheduledJob.objects.filter(name=scheduled_job.name).update(
+        runs=F("runs") + 1,
+        failures=F("failures") + (1 if error else 0),
+        last_duration_ms=duration_ms,
+        total_duration_ms=F("total_duration_ms") + duration_ms,
+        last_error=error,
+    )
+    logger.info("Job %s executado em %d ms", scheduled_job.name, duration_ms)
+    return duration_ms, not error
+
+
+def due_jobs(moment):
+    """Jobs cujo cron casa com o minuto de ``moment`` e que ainda não rodaram nesse minuto."""
+    minute = moment.replace(second=0, microsecond=0)
+    matching = [scheduled_job for scheduled_job in registry.values() if scheduled_job.schedule.matches(minute)]
+    already_ran = set(
+        ScheduledJob.objects.filter(
+            name__in=[scheduled_job.name for scheduled_job in matching],
+            last_started_at__gte=minute,
+        ).values_list("name", flat=True)
+    )
+    return [scheduled_job for scheduled_job in matching if scheduled_job.name not in already_ran]
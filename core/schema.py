@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import threading
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "x-code-version"
+RENDERERS = {"json": OpenApiJsonRenderer, "yaml": OpenApiYamlRenderer}
+
+# (versão do código, formato) -> (conteúdo, etag)
+_documents = {}
+_lock = threading.Lock()
+
+
+@cache
+def code_version():
+    """``CODE_VERSION`` do deploy ou, sem ele, um hash dos arquivos .py do projeto (calculado uma vez)."""
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    digest = hashlib.sha256()
+    packages = [path for path in Path(settings.BASE_DIR).iterdir() if (path / "__init__.py").exists()]
+    for path in sorted(file for package in packages for file in package.rglob("*.py")):
+        stat = path.stat()
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()[:16]
+
+
+def generate_schema():
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    schema[VERSION_KEY] = code_version()
+    return schema
+
+
+def render_schema(schema, fmt):
+    content = RENDERERS[fmt]().render(schema, renderer_context={})
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def load_prebuilt_schema():
+    """Schema do ``build_schema`` se o arquivo existir e for da versão atual do código."""
+    path = Path(settings.SCHEMA_FILE) if settings.SCHEMA_FILE else None
+    if path is None or not path.exists():
+        return None
+    schema = json.loads(path.read_bytes())
+    if schema.get(VERSION_KEY) != code_version():
+        logger.warning(
+            "Schema em %s é da versão %s; código atual é %s.", path, schema.get(VERSION_KEY), code_version()
+        )
+        return None
+    return schema
+
+
+def schema_document(fmt):
+    key = (code_version(), fmt)
+    document = _documents.get(key)
+    if document is None:
+        with _lock:
+            document = _documents.get(key)
+            if document is None:
+                schema = load_prebuilt_schema()
+                if schema is None:
+                    logger.warning("Schema pré-gerado indisponível; gerando uma vez para a versão %s.", key[0])
+                    schema = generate_schema()
+                document = _documents[key] = render_schema(schema, fmt)
+    return document
+
+
+class SchemaView(View):
+    """Schema OpenAPI com ETag forte.
+
+    Fora do ``DEBUG`` o documento vem do arquivo do ``build_schema`` e fica em memória por versão do
+    código; no ``DEBUG`` é gerado a cada requisição para refletir as mudanças locais.
+    """
+
+    def get(self, request):
+        wants_json = request.GET.get("format") == "json" or "json" in request.headers.get("Accept", "")
+        fmt = "json" if wants_json else "yaml"
+        if settings.DEBUG:
+            content, etag = render_schema(generate_schema(), fmt)
+        else:
+            content, etag = schema_document(fmt)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=RENDERERS[fmt].media_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, no-cache"
+        response["Vary"] = "Accept"
+        return response
@@ -0,0 +1,216 @@
+import heapq
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+
+from .models import Coach, Court
+
+User = get_user_model()
+
+KIND_MEMBER = "member"
+KIND_COACH = "coach"
+KIND_COURT = "court"
+
+# Campos pesquisados de cada tipo; a migration 0017 cria os índices de trigramas deles no PostgreSQL.
+SEARCH_FIELDS = {
+    KIND_MEMBER: (User, ("first_name", "last_name", "username", "email")),
+    KIND_COACH: (Coach, ("name",)),
+    KIND_COURT: (Court, ("name",)),
+}
+
+# Mesmo corte do operador %> do pg_trgm (pg_trgm.word_similarity_threshold).
+SIMILARITY_THRESHOLD = 0.6
+
+WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return WORD.findall(text.casefold())
+
+
+def trigrams(word):
+    """Trigramas como o pg_trgm: dois espaços antes e um depois da palavra."""
+    padded = f"  {word} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+def _result(kind, pk, label, detail, score):
+    return {"type": kind, "id": pk, "label": label, "detail": detail, "score": round(score, 3)}
+
+
+def _member_result(pk, first_name, last_name, username, email, score):
+    return _result(KIND_MEMBER, pk, f"{first_name} {last_name}".strip() or username, email, score)
+
+
+def _coach_result(pk, name, phone, score):
+    return _result(KIND_COACH, pk, name, phone, score)
+
+
+def _court_result(pk, name, surface, score):
+    return _result(KIND_COURT, pk, name, Court.Surface(surface).label, score)
+
+
+# Colunas lidas de cada tipo e como viram um resultado.
+RESULT_COLUMNS = {
+    KIND_MEMBER: (("id", "first_name", "last_name", "username", "email"), _member_result),
+    KIND_COACH: (("id", "name", "phone"), _coach_result),
+    KIND_COURT: (("id", "name", "surface"), _court_result),
+}
+
+
+def indexed_fields(model):
+    """Campos do modelo que aparecem na busca; alterá-los desatualiza o índice em memória."""
+    kind = next(kind for kind, (searched, _) in SEARCH_FIELDS.items() if searched is model)
+    return {"club", *RESULT_COLUMNS[kind][0]}
+
+
+def _postgres_search(kind, club_id, tokens, limit):
+    """Cada palavra da busca precisa casar com algum campo (ILIKE ou %>), ambos cobertos pelos índices GIN."""
+    from django.contrib.postgres.lookups import TrigramWordSimilar
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    model, fields = SEARCH_FIELDS[kind]
+    columns, build = RESULT_COLUMNS[kind]
+    queryset = model.objects.filter(club_id=club_id)
+    ranks = []
+    for token in tokens:
+        matches = Q()
+        for field in fields:
+            matches |= Q(**{f"{field}__icontains": token}) | Q(TrigramWordSimilar(Upper(field), token.upper()))
+        queryset = queryset.filter(matches)
+        similarities = [TrigramWordSimilarity(token, field) for field in fields]
+        ranks.append(Greatest(*similarities) if len(similarities) > 1 else similarities[0])
+    score = sum(ranks[1:], ranks[0]) / len(ranks)
+    rows = queryset.annotate(score=score).order_by("-score", columns[1]).values_list(*columns, "score")[:limit]
+    return [build(*row) for row in rows]
+
+
+class NGramIndex:
+    """Índice de trigramas, em memória, dos membros, professores e quadras de um clube.
+
+    Usado quando o banco não tem pg_trgm (SQLite em desenvolvimento). Os trigramas apontam para o
+    vocabulário do clube (nomes se repetem muito) e cada palavra para os documentos em que aparece.
+    A nota de uma palavra da busca é a fração dos seus trigramas presentes na palavra do documento,
+    próxima do word_similarity do PostgreSQL.
+    """
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.words = []
+        self.word_documents = []
+        self.postings = defaultdict(list)
+        word_ids = {}
+        for position, (_, _, words) in enumerate(documents):
+            for word in set(words):
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = word_ids[word] = len(self.words)
+                    self.words.append(word)
+                    self.word_documents.append([])
+                    for gram in trigrams(word):
+                        self.postings[gram].append(word_id)
+                self.word_documents[word_id].append(position)
+
+    @classmethod
+    def load(cls, club_id):
+        documents = []
+        for kind, (model, fields) in SEARCH_FIELDS.items():
+            columns = RESULT_COLUMNS[kind][0]
+            for row in model.objects.filter(club_id=club_id).values_list(*columns):
+                values = dict(zip(columns, row))
+                words = tokenize(" ".join(values[field] for field in fields))
+                documents.append((kind, row, words))
+        return cls(documents)
+
+    def _token_scores(self, token):
+        """Melhor nota de cada documento para uma palavra da busca."""
+        grams = trigrams(token)
+        hits = Counter()
+        for gram in grams:
+            hits.update(self.postings.get(gram, ()))
+        scores = {}
+        for word_id, count in hits.items():
+            score = count / len(grams)
+            if score < SIMILARITY_THRESHOLD and token not in self.words[word_id]:
+                continue
+            for position in self.word_documents[word_id]:
+                if scores.get(position, 0) < score:
+                    scores[position] = score
+        return scores
+
+    def search(self, tokens, kinds, limit):
+        totals = None
+        for token in tokens:
+            scores = self._token_scores(token)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {
+                    position: totals[position] + score for position, score in scores.items() if position in totals
+                }
+            if not totals:
+                return []
+
+        candidates = [(position, total) for position, total in totals.items() if self.documents[position][0] in kinds]
+        best = heapq.nsmallest(limit, candidates, key=lambda item: (-item[1], self.documents[item[0]][2]))
+        results = []
+        for position, total in best:
+            kind, row, _ = self.documents[position]
+            results.append(RESULT_COLUMNS[kind][1](*row, total / len(tokens)))
+        return results
+
+
+def version_cache_key(club_id):
+    return f"search-index-version:{club_id}"
+
+
+class NGramIndexes:
+    """Um NGramIndex por clube, recarregado quando a versão no cache muda ou após ``SEARCH_INDEX_TTL``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def get(self, club_id):
+        version = cache.get(version_cache_key(club_id))
+        entry = self._indexes.get(club_id)
+        if entry is not None:
+            loaded_version, loaded_at, index = entry
+            if loaded_version == version and time.monotonic() - loaded_at <= settings.SEARCH_INDEX_TTL:
+                return index
+        index = NGramIndex.load(club_id)
+        with self._lock:
+            self._indexes[club_id] = (version, time.monotonic(), index)
+        return index
+
+    def invalidate(self, club_id):
+        cache.set(version_cache_key(club_id), uuid.uuid4().hex, None)
+        with self._lock:
+            self._indexes.pop(club_id, None)
+
+
+ngram_indexes = NGramIndexes()
+
+
+def uses_trigram_indexes():
+    return connection.vendor == "postgresql"
+
+
+def search(club_id, query, kinds=tuple(SEARCH_FIELDS), limit=20):
+    """Resultados de todos os tipos pedidos, do mais parecido com a busca para o menos."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    if not uses_trigram_indexes():
+        return ngram_indexes.get(club_id).search(tokens, set(kinds), limit)
+    results = [result for kind in kinds for result in _postgres_search(kind, club_id, tokens, limit)]
+    return sorted(results, key=lambda result: (-result["score"], result["label"].casefold()))[:limit]
@@ -1,8 +1,20 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Club, Coach, Court, Reservation
+from .booking import get_policy
+from .maintenance import RESOLUTION_CANCEL, RESOLUTION_MOVE
+from .models import (
+    AuditLogEntry,
+    BookingPolicy,
+    Club,
+    Coach,
+    Court,
+    CourtMaintenanceWindow,
+    PlayerStats,
+    Reservation,
+)
 
 User = get_user_model()
 
@@ -65,9 +77,9 @@ class CourtSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
     def validate(self, attrs):
-        club = self.context["request"].user.club
+        club_id = self.context["request"].user.club_id
         name = attrs.get("name", "")
-        if club and Court.objects.filter(club=club, name=name).exclude(id=self.instance.id if self.instance else None).exists():
+        if club_id and Court.objects.filter(club_id=club_id, name=name).exclude(id=self.instance.id if self.instance else None).exists():
             raise serializers.ValidationError({"name": "Já existe uma quadra com esse nome no clube."})
         return attrs
 
@@ -79,8 +91,8 @@ class CoachSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
     def validate_name(self, value):
-        club = self.context["request"].user.club
-        if club and Coach.objects.filter(club=club, name__iexact=value).exclude(
+        club_id = self.context["request"].user.club_id
+        if club_id and Coach.objects.filter(club_id=club_id, name__iexact=value).exclude(
             id=self.instance.id if self.instance else None
         ).exists():
             raise serializers.ValidationError("Já existe um coach com esse nome no clube.")
@@ -91,6 +103,8 @@ class ReservationSerializer(serializers.ModelSerializer):
     player = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
     player_name = serializers.SerializerMethodField()
     court_name = serializers.CharField(source="court.name", read_only=True)
+    coach = serializers.PrimaryKeyRelatedField(queryset=Coach.objects.all(), required=False, allow_null=True)
+    coach_name = serializers.CharField(source="coach.name", read_only=True, allow_null=True)
 
     class Meta:
         model = Reservation
@@ -100,6 +114,8 @@ class ReservationSerializer(serializers.ModelSerializer):
             "court_name",
             "player",
             "player_name",
+            "coach",
+            "coach_name",
             "start_time",
             "end_time",
             "status",
@@ -113,6 +129,10 @@ class ReservationSerializer(serializers.ModelSerializer):
         court = attrs.get("court")
         request_user = self.context["request"].user
         player = attrs.get("player") or request_user
+        if "coach" in attrs:
+            coach = attrs["coach"]
+        else:
+            coach = self.instance.coach if self.instance else None
         current_tz = timezone.get_current_timezone()
 
         if start and timezone.is_naive(start):
@@ -124,34 +144,41 @@ class ReservationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Informe início e fim da reserva.")
         if end <= start:
             raise serializers.ValidationError("Horário final deve ser maior que o inicial.")
-        if start < timezone.now():
-            raise serializers.ValidationError("Não é possível criar reservas retroativas.")
-        local_start_date = start.astimezone(current_tz).date()
-        if request_user.role == User.Roles.PLAYER and local_start_date != timezone.localdate():
-            raise serializers.ValidationError("Jogadores só podem criar reservas para o dia atual.")
         if not court:
             raise serializers.ValidationError({"court": "Selecione uma quadra."})
         if player.club_id != court.club_id:
             raise serializers.ValidationError("Quadra e jogador precisam pertencer ao mesmo clube.")
+        policy = get_policy(court.club_id)
+        violation = policy.check_times(start, end, booked_by_player=request_user.role == User.Roles.PLAYER)
+        if violation:
+            raise serializers.ValidationError(violation)
         if court.status == Court.Status.MAINTENANCE:
             raise serializers.ValidationError({"court": "Quadra em manutenção. Escolha outra quadra."})
+        if coach and coach.club_id != court.club_id:
+            raise serializers.ValidationError({"coach": "Coach precisa pertencer ao clube da quadra."})
+        if CourtMaintenanceWindow.objects.filter(court=court, start_time__lt=end, end_time__gt=start).exists():
+            raise serializers.ValidationError({"court": "Quadra em manutenção nesse horário. Escolha outra quadra."})
 
-        qs = Reservation.objects.filter(court=court, start_time__lt=end, end_time__gt=start)
+        # Quadra e coach verificados numa única consulta de sobreposição.
+        overlap = Q(court=court)
+        if coach:
+            overlap |= Q(coach=coach)
+        qs = Reservation.objects.filter(overlap, start_time__lt=end, end_time__gt=start)
         if self.instance:
             qs = qs.exclude(id=self.instance.id)
-        if qs.exists():
+        conflict_court_id = qs.values_list("court_id", flat=True).first()
+        if conflict_court_id == court.id:
             raise serializers.ValidationError("Já existe uma reserva para essa quadra nesse horário.")
+        if conflict_court_id is not None:
+            raise serializers.ValidationError({"coach": "Coach já tem uma reserva nesse horário."})
 
-        daily_reservations = Reservation.objects.filter(
-            player=player,
-            start_time__date=local_start_date,
-        )
-        if self.instance:
-            daily_reservations = daily_reservations.exclude(id=self.instance.id)
-        if daily_reservations.exists():
-            raise serializers.ValidationError("Cada jogador pode ter no máximo uma reserva por dia.")
+        reservation_type = attrs.get("type") or (self.instance.type if self.instance else Reservation.Type.TRAINING)
+        violation = policy.check_counts(player, start, reservation_type, self.instance.id if self.instance else None)
+        if violation:
+            raise serializers.ValidationError(violation)
 
         attrs["player"] = player
+        attrs["coach"] = coach
         attrs["start_time"] = start
         attrs["end_time"] = end
         return attrs
@@ -159,3 +186,109 @@ class ReservationSerializer(serializers.ModelSerializer):
     def get_player_name(self, obj):
         full_name = obj.player.get_full_name()
         return full_name or obj.player.username or obj.player.email
+
+
+class BookingPolicySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BookingPolicy
+        fields = (
+            "max_per_day",
+            "max_per_week",
+            "player_advance_days",
+            "max_duration_minutes",
+            "peak_starts_at",
+            "peak_ends_at",
+            "peak_weekly_quotas",
+            "updated_at",
+        )
+        read_only_fields = ("updated_at",)
+
+    def validate_peak_weekly_quotas(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Informe um objeto {tipo: limite}.")
+        for key, quota in value.items():
+            if key not in Reservation.Type.values:
+                raise serializers.ValidationError(f"Tipo de reserva inválido: {key}.")
+            if not isinstance(quota, int) or isinstance(quota, bool) or quota < 0:
+                raise serializers.ValidationError("Os limites precisam ser inteiros não negativos.")
+        return value
+
+    def validate(self, attrs):
+        starts_at = attrs.get("peak_starts_at", getattr(self.instance, "peak_starts_at", None))
+        ends_at = attrs.get("peak_ends_at", getattr(self.instance, "peak_ends_at", None))
+        quotas = attrs.get("peak_weekly_quotas", getattr(self.instance, "peak_weekly_quotas", None))
+        if (starts_at is None) != (ends_at is None):
+            raise serializers.ValidationError("Informe início e fim do horário de pico.")
+        if starts_at is not None and ends_at <= starts_at:
+            raise serializers.ValidationError("O fim do horário de pico deve ser maior que o início.")
+        if quotas and starts_at is None:
+            raise serializers.ValidationError({"peak_weekly_quotas": "Defina o horário de pico antes das cotas."})
+        return attrs
+
+
+class CourtMaintenanceWindowSerializer(serializers.ModelSerializer):
+    court_name = serializers.CharField(source="court.name", read_only=True)
+    resolution = serializers.ChoiceField(
+        choices=(RESOLUTION_MOVE, RESOLUTION_CANCEL), default=RESOLUTION_MOVE, write_only=True
+    )
+
+    class Meta:
+        model = CourtMaintenanceWindow
+        fields = ("id", "court", "court_name", "start_time", "end_time", "reason", "resolution", "created_at")
+        read_only_fields = ("id", "created_at")
+
+    def validate(self, attrs):
+        court = attrs["court"]
+        start = attrs["start_time"]
+        end = attrs["end_time"]
+        if court.club_id != self.context["request"].user.club_id:
+            raise serializers.ValidationError({"court": "Quadra não pertence ao seu clube."})
+        if end <= start:
+            raise serializers.ValidationError("Horário final deve ser maior que o inicial.")
+        if end <= timezone.now():
+            raise serializers.ValidationError("A manutenção precisa terminar no futuro.")
+        if CourtMaintenanceWindow.objects.filter(court=court, start_time__lt=end, end_time__gt=start).exists():
+            raise serializers.ValidationError("Já existe uma manutenção para essa quadra nesse período.")
+        return attrs
+
+
+class PlayerStatsSerializer(serializers.ModelSerializer):
+    player_name = serializers.CharField(read_only=True)
+    favourite_court_name = serializers.CharField(read_only=True, allow_null=True)
+    rank = serializers.IntegerField(read_only=True)
+    cancellation_rate = serializers.SerializerMethodField()
+    by_type = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PlayerStats
+        fields = (
+            "rank",
+            "player",
+            "player_name",
+            "total_reservations",
+            "canceled_reservations",
+            "cancellation_rate",
+            "by_type",
+            "favourite_court",
+            "favourite_court_name",
+            "last_reservation_at",
+        )
+
+    def get_cancellation_rate(self, obj):
+        if not obj.total_reservations:
+            return 0.0
+        return round(obj.canceled_reservations / obj.total_reservations, 4)
+
+    def get_by_type(self, obj):
+        return {
+            Reservation.Type.TRAINING: obj.training_reservations,
+            Reservation.Type.RECREATIONAL: obj.recreational_reservations,
+            Reservation.Type.TOURNAMENT: obj.tournament_reservations,
+            Reservation.Type.PERFORMANCE: obj.performance_reservations,
+        }
+
+
+class AuditLogEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuditLogEntry
+        fields = ("id", "created_at", "actor", "actor_name", "kind", "object_id", "action", "changes")
@@ -0,0 +1,214 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import audit, availability, calendar, search, sync
+from .live import broadcaster
+from .booking import policy_cache_key
+from .models import (
+    BookingPolicy,
+    ChangeLogEntry,
+    Club,
+    ClubUser,
+    Coach,
+    Court,
+    CourtMaintenanceWindow,
+    Reservation,
+)
+from .slug_index import slug_index
+from .stats import refresh_player_stats
+from .tenancy import club_cache_key
+
+
+def reservation_payload(reservation):
+    return {
+        "id": reservation.id,
+        "court": reservation.court_id,
+        "player": reservation.player_id,
+        "coach": reservation.coach_id,
+        "start_time": reservation.start_time.isoformat(),
+        "end_time": reservation.end_time.isoformat(),
+        "status": reservation.status,
+        "type": reservation.type,
+    }
+
+
+def publish_on_commit(club_id, event, data):
+    transaction.on_commit(lambda: broadcaster.publish(club_id, event, data))
+
+
+def bump_availability_on_commit(*court_ids):
+    def bump():
+        for court_id in set(court_ids) - {None}:
+            availability.bump_version(court_id)
+
+    transaction.on_commit(bump)
+
+
+def refresh_stats_on_commit(*player_ids):
+    transaction.on_commit(lambda: refresh_player_stats(player_ids))
+
+
+def bump_calendars_on_commit(player_ids=(), court_ids=(), club_id=None):
+    transaction.on_commit(lambda: calendar.bump_versions(player_ids, court_ids, club_id))
+
+
+def deleting_club(origin):
+    # Removendo o clube inteiro: o log de sync dele vai junto, nada a registrar.
+    return (origin.model if isinstance(origin, QuerySet) else type(origin)) is Club
+
+
+def invalidate_search_on_commit(club_id):
+    # No PostgreSQL a busca vai direto aos índices de trigramas; só o índice em memória precisa recarregar.
+    if club_id and not search.uses_trigram_indexes():
+        transaction.on_commit(lambda: search.ngram_indexes.invalidate(club_id))
+
+
+@receiver(post_init, sender=Reservation)
+def reservation_loaded(sender, instance, **kwargs):
+    # Quadra e jogador originais: se a reserva mudar de um para outro, os dois lados são atualizados.
+    instance._loaded_court_id = instance.court_id
+    instance._loaded_player_id = instance.player_id
+
+
+@receiver(post_save, sender=Reservation)
+def reservation_saved(sender, instance, created, **kwargs):
+    if created:
+        event = "reservation.created"
+    elif instance.status == Reservation.Status.CANCELED:
+        event = "reservation.canceled"
+    else:
+        event = "reservation.updated"
+    publish_on_commit(instance.club_id, event, reservation_payload(instance))
+    bump_availability_on_commit(instance.court_id, instance._loaded_court_id)
+    refresh_stats_on_commit(instance.player_id, instance._loaded_player_id)
+    bump_calendars_on_commit(
+        player_ids=(instance.player_id, instance._loaded_player_id),
+        court_ids=(instance.court_id, instance._loaded_court_id),
+    )
+    # O jogador anterior também recebe a entrada: no sync dele a reserva vira remoção.
+    sync.record_change(
+        instance.club_id,
+        ChangeLogEntry.Kind.RESERVATION,
+        instance.pk,
+        player_ids=(instance.player_id, instance._loaded_player_id),
+    )
+    instance._loaded_court_id = instance.court_id
+    instance._loaded_player_id = instance.player_id
+
+
+@receiver(post_delete, sender=Reservation)
+def reservation_deleted(sender, instance, origin=None, **kwargs):
+    publish_on_commit(instance.club_id, "reservation.canceled", reservation_payload(instance))
+    bump_availability_on_commit(instance.court_id)
+    refresh_stats_on_commit(instance.player_id)
+    bump_calendars_on_commit(player_ids=(instance.player_id,), court_ids=(instance.court_id,))
+    if deleting_club(origin):
+        return
+    sync.record_change(
+        instance.club_id,
+        ChangeLogEntry.Kind.RESERVATION,
+        instance.pk,
+        ChangeLogEntry.Action.DELETE,
+        player_ids=(instance.player_id,),
+    )
+
+
+@receiver(pre_save, sender=Court)
+def court_remember_status(sender, instance, **kwargs):
+    instance._previous_status = None
+    if instance.pk:
+        instance._previous_status = Court.objects.filter(pk=instance.pk).values_list("status", flat=True).first()
+
+
+@receiver(post_save, sender=Court)
+def court_saved(sender, instance, created, **kwargs):
+    if created or instance._previous_status != instance.status:
+        publish_on_commit(instance.club_id, "court.status", {"id": instance.id, "status": instance.status})
+    if not created:
+        # O nome da quadra aparece nos feeds dos jogadores do clube.
+        bump_calendars_on_commit(club_id=instance.club_id)
+    sync.record_change(instance.club_id, ChangeLogEntry.Kind.COURT, instance.pk)
+
+
+@receiver(post_delete, sender=Court)
+def court_deleted(sender, instance, origin=None, **kwargs):
+    if not deleting_club(origin):
+        sync.record_change(instance.club_id, ChangeLogEntry.Kind.COURT, instance.pk, ChangeLogEntry.Action.DELETE)
+
+
+@receiver(post_save, sender=Coach)
+def coach_saved(sender, instance, **kwargs):
+    sync.record_change(instance.club_id, ChangeLogEntry.Kind.COACH, instance.pk)
+
+
+@receiver(pre_delete, sender=Coach)
+def coach_deleting(sender, instance, origin=None, **kwargs):
+    # As reservações do coach ficam com coach nulo (SET_NULL, sem signals).
+    if not deleting_club(origin):
+        sync.record_reservation_changes(instance.reservations.all())
+
+
+@receiver(post_delete, sender=Coach)
+def coach_deleted(sender, instance, origin=None, **kwargs):
+    if not deleting_club(origin):
+        sync.record_change(instance.club_id, ChangeLogEntry.Kind.COACH, instance.pk, ChangeLogEntry.Action.DELETE)
+
+
+@receiver(post_save, sender=CourtMaintenanceWindow)
+@receiver(post_delete, sender=CourtMaintenanceWindow)
+def maintenance_window_changed(sender, instance, **kwargs):
+    bump_availability_on_commit(instance.court_id)
+
+
+@receiver(post_save, sender=ClubUser)
+@receiver(post_save, sender=Coach)
+@receiver(post_save, sender=Court)
+def searchable_saved(sender, instance, update_fields=None, **kwargs):
+    # Login grava só last_login: nada que a busca mostre mudou.
+    if update_fields is None or set(update_fields) & search.indexed_fields(sender):
+        invalidate_search_on_commit(instance.club_id)
+
+
+@receiver(post_delete, sender=ClubUser)
+@receiver(post_delete, sender=Coach)
+@receiver(post_delete, sender=Court)
+def searchable_deleted(sender, instance, **kwargs):
+    invalidate_search_on_commit(instance.club_id)
+
+
+@receiver(post_save, sender=ClubUser)
+@receiver(post_save, sender=Coach)
+@receiver(post_save, sender=Court)
+@receiver(post_save, sender=Reservation)
+def audited_saved(sender, instance, created, **kwargs):
+    audit.record_save(instance, created)
+
+
+@receiver(post_delete, sender=ClubUser)
+@receiver(post_delete, sender=Coach)
+@receiver(post_delete, sender=Court)
+@receiver(post_delete, sender=Reservation)
+def audited_deleted(sender, instance, **kwargs):
+    audit.record_delete(instance)
+
+
+@receiver(post_save, sender=BookingPolicy)
+@receiver(post_delete, sender=BookingPolicy)
+def booking_policy_changed(sender, instance, **kwargs):
+    cache.delete(policy_cache_key(instance.club_id))
+
+
+@receiver(post_save, sender=Club)
+def club_saved(sender, instance, created, **kwargs):
+    cache.delete(club_cache_key(instance.pk))
+    created_slug = instance.slug if created else None
+    transaction.on_commit(lambda: slug_index.invalidate(created_slug))
+
+
+@receiver(post_delete, sender=Club)
+def club_deleted(sender, instance, **kwargs):
+    cache.delete(club_cache_key(instance.pk))
+    transaction.on_commit(slug_index.invalidate)
@@ -0,0 +1,99 @@
+import bisect
+import threading
+import time
+import uuid
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .caching import is_shared_cache
+from .models import Club
+
+VERSION_CACHE_KEY = "club-slug-index-version"
+SLUG_MAX_LENGTH = Club._meta.get_field("slug").max_length
+
+
+class SlugIndex:
+    """Índice ordenado, em memória, dos slugs de clube já usados.
+
+    Recarregado do banco a cada ``CLUB_SLUG_INDEX_TTL`` segundos ou quando a
+    versão no cache muda (criação/remoção de clube em qualquer worker). Sem cache
+    compartilhado a versão não chega aos outros workers; aí o slug que o índice dá
+    como livre é confirmado no banco.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slugs = []
+        self._loaded_at = None
+        self._version = None
+
+    def _ensure_fresh(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        expired = self._loaded_at is None or time.monotonic() - self._loaded_at > settings.CLUB_SLUG_INDEX_TTL
+        if expired or version != self._version:
+            self.refresh(version)
+
+    def refresh(self, version=None):
+        slugs = sorted(Club.objects.values_list("slug", flat=True))
+        with self._lock:
+            self._slugs = slugs
+            self._loaded_at = time.monotonic()
+            self._version = version
+
+    def invalidate(self, created_slug=None):
+        version = uuid.uuid4().hex
+        cache.set(VERSION_CACHE_KEY, version, None)
+        with self._lock:
+            if created_slug is None or self._loaded_at is None:
+                self._loaded_at = None
+                return
+            # Clube novo neste worker: insere direto no índice, sem recarregar do banco.
+            if not self._contains(self._slugs, created_slug):
+                bisect.insort(self._slugs, created_slug)
+            self._version = version
+
+    def _contains(self, slugs, slug):
+        index = bisect.bisect_left(slugs, slug)
+        return index < len(slugs) and slugs[index] == slug
+
+    def _taken_in_db(self, slugs):
+        """Slugs dados como livres pelo índice, mas já usados no banco (clube criado em outro worker)."""
+        if not slugs or is_shared_cache():
+            return set()
+        taken = set(Club.objects.filter(slug__in=slugs).values_list("slug", flat=True))
+        if taken:
+            with self._lock:
+                for slug in taken:
+                    if not self._contains(self._slugs, slug):
+                        bisect.insort(self._slugs, slug)
+        return taken
+
+    def is_taken(self, slug):
+        self._ensure_fresh()
+        return self._contains(self._slugs, slug) or bool(self._taken_in_db([slug]))
+
+    def suggestions(self, slug, limit):
+        self._ensure_fresh()
+        while True:
+            slugs = self._slugs
+            suggestions = []
+            for candidate in self._candidates(slug):
+                if len(suggestions) >= limit:
+                    break
+                if candidate not in suggestions and not self._contains(slugs, candidate):
+                    suggestions.append(candidate)
+            # Os que o banco acusar entram no índice, e a busca recomeça sem eles.
+            if not self._taken_in_db(suggestions):
+                return suggestions
+
+    def _candidates(self, slug):
+        numbers = (str(number) for number in range(2, 10000))
+        first_numbers = [next(numbers) for _ in range(2)]
+        for suffix in chain(first_numbers, settings.CLUB_SLUG_SUGGESTION_SUFFIXES, numbers):
+            base = slug[: SLUG_MAX_LENGTH - len(suffix) - 1].rstrip("-")
+            yield f"{base}-{suffix}"
+
+
+slug_index = SlugIndex()
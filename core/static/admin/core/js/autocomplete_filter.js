@@ -0,0 +1,19 @@
+'use strict';
+// Aplica o filtro da changelist assim que um valor é escolhido no select2.
+{
+    const $ = django.jQuery;
+    $(function() {
+        $('.autocomplete-filter select').on('change', function() {
+            const container = $(this).closest('.autocomplete-filter');
+            const queryString = container.data('query-string');
+            const value = $(this).val();
+            if (!value) {
+                window.location.search = queryString;
+                return;
+            }
+            const separator = queryString === '?' ? '' : '&';
+            const lookup = encodeURIComponent(container.data('lookup'));
+            window.location.search = `${queryString}${separator}${lookup}=${encodeURIComponent(value)}`;
+        });
+    });
+}
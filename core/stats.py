@@ -0,0 +1,78 @@
+from django.db.models import Count, Max, Q
+
+from .models import ClubUser, PlayerStats, Reservation
+
+TYPE_FIELDS = {
+    Reservation.Type.TRAINING: "training_reservations",
+    Reservation.Type.RECREATIONAL: "recreational_reservations",
+    Reservation.Type.TOURNAMENT: "tournament_reservations",
+    Reservation.Type.PERFORMANCE: "performance_reservations",
+}
+STATS_FIELDS = [
+    "club",
+    "total_reservations",
+    "canceled_reservations",
+    *TYPE_FIELDS.values(),
+    "favourite_court",
+    "last_reservation_at",
+    "updated_at",
+]
+
+
+def refresh_player_stats(player_ids):
+    """Recalcula o resumo dos jogadores informados com duas agregações no banco (totais e quadra favorita).
+
+    O clube do resumo é o do jogador: agrupar também pelo clube das reservas daria duas linhas para quem
+    tem reservas em mais de um clube, e o upsert bateria duas vezes na mesma linha.
+    """
+    player_ids = {player_id for player_id in player_ids if player_id is not None}
+    if not player_ids:
+        return 0
+
+    reservations = Reservation.objects.filter(player_id__in=player_ids).order_by()
+    totals = reservations.values("player_id").annotate(
+        total_reservations=Count("id"),
+        canceled_reservations=Count("id", filter=Q(status=Reservation.Status.CANCELED)),
+        last_reservation_at=Max("start_time"),
+        **{field: Count("id", filter=Q(type=value)) for value, field in TYPE_FIELDS.items()},
+    )
+    favourites = {}
+    court_counts = (
+        reservations.exclude(status=Reservation.Status.CANCELED)
+        .values("player_id", "court_id")
+        .annotate(count=Count("id"))
+        .order_by("player_id", "-count", "court_id")
+    )
+    for row in court_counts:
+        favourites.setdefault(row["player_id"], row["court_id"])
+
+    clubs = dict(ClubUser.objects.filter(pk__in=player_ids, club__isnull=False).values_list("pk", "club_id"))
+    stats = []
+    for row in totals:
+        player_id = row.pop("player_id")
+        if player_id not in clubs:
+            continue
+        stats.append(
+            PlayerStats(
+                player_id=player_id,
+                club_id=clubs[player_id],
+                favourite_court_id=favourites.get(player_id),
+                **row,
+            )
+        )
+    PlayerStats.objects.bulk_create(
+        stats,
+        update_conflicts=True,
+        unique_fields=["player"],
+        update_fields=STATS_FIELDS,
+    )
+    PlayerStats.objects.filter(player_id__in=player_ids - {item.player_id for item in stats}).delete()
+    return len(stats)
+
+
+def rebuild_player_stats(batch_size=1000):
+    player_ids = list(Reservation.objects.order_by().values_list("player_id", flat=True).distinct())
+    for start in range(0, len(player_ids), batch_size):
+        refresh_player_stats(player_ids[start : start + batch_size])
+    PlayerStats.objects.exclude(player_id__in=Reservation.objects.values("player_id")).delete()
+    return len(player_ids)
@@ -0,0 +1,139 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ChangeLogEntry, Coach, Court, Reservation
+from .rows import coach_rows, court_rows, reservation_rows
+
+# Tipo no log -> chave da resposta e como montar as linhas (mesmo formato das listagens, com updated_at).
+KINDS = {
+    ChangeLogEntry.Kind.COURT: ("courts", court_rows),
+    ChangeLogEntry.Kind.COACH: ("coaches", coach_rows),
+    ChangeLogEntry.Kind.RESERVATION: ("reservations", reservation_rows),
+}
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def record_change(club_id, kind, object_id, action=ChangeLogEntry.Action.UPSERT, player_ids=()):
+    """Registra a alteração na mesma transação que a fez; uma entrada por jogador afetado."""
+    entries = [
+        ChangeLogEntry(club_id=club_id, kind=kind, object_id=object_id, action=action, player_id=player_id)
+        for player_id in set(player_ids) - {None} or {None}
+    ]
+    ChangeLogEntry.objects.bulk_create(entries)
+
+
+def record_reservation_changes(reservations, action=ChangeLogEntry.Action.UPSERT):
+    ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(
+            club_id=reservation.club_id,
+            kind=ChangeLogEntry.Kind.RESERVATION,
+            object_id=reservation.pk,
+            action=action,
+            player_id=reservation.player_id,
+        )
+        for reservation in reservations
+    )
+
+
+def make_token(seq):
+    return f"{seq}.{int(time.time())}"
+
+
+def parse_token(token):
+    try:
+        seq, issued_at = (int(part) for part in token.split("."))
+        return seq, datetime.fromtimestamp(issued_at, tz=UTC)
+    except (ValueError, OverflowError, OSError):
+        raise InvalidToken(token)
+
+
+def _settled_entries(club_id):
+    """Entradas com mais de ``SYNC_SETTLE_SECONDS``.
+
+    O ``created_at`` é o momento do INSERT, não do commit: uma transação aberta por mais tempo que a
+    janela ainda pode confirmar um id menor que o já entregue, e essa alteração não chega pelo delta.
+    A janela só limita essa corrida às transações mais longas que ela; não a elimina.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    return ChangeLogEntry.objects.filter(club_id=club_id, created_at__lt=cutoff)
+
+
+def _querysets(club_id, user):
+    reservations = Reservation.objects.filter(club_id=club_id)
+    if user.role != "admin":
+        reservations = reservations.filter(player=user)
+    return {
+        ChangeLogEntry.Kind.COURT: Court.objects.filter(club_id=club_id),
+        ChangeLogEntry.Kind.COACH: Coach.objects.filter(club_id=club_id),
+        ChangeLogEntry.Kind.RESERVATION: reservations,
+    }
+
+
+def _rows(club_id, user, ids=None):
+    rows = {}
+    for kind, queryset in _querysets(club_id, user).items():
+        name, build = KINDS[kind]
+        if ids is None:
+            rows[name] = build(queryset, include_updated_at=True)
+        elif ids[kind]:
+            rows[name] = build(queryset.filter(pk__in=ids[kind]), include_updated_at=True)
+        else:
+            rows[name] = []
+    return rows
+
+
+def snapshot(club_id, user):
+    """Estado completo, para o primeiro sync ou quando o token é antigo demais."""
+    seq = _settled_entries(club_id).order_by("-id").values_list("id", flat=True).first() or 0
+    return {
+        "token": make_token(seq),
+        "reset": True,
+        "has_more": False,
+        **_rows(club_id, user),
+        "deleted": {name: [] for name, _ in KINDS.values()},
+    }
+
+
+def changes_since(club_id, user, token):
+    """Linhas criadas, alteradas ou removidas depois do token, em ordem de sequência.
+
+    Várias alterações do mesmo objeto viram uma só linha com o estado atual; o que não existe mais
+    (ou deixou de ser visível para o jogador) volta em ``deleted``.
+    """
+    seq, issued_at = parse_token(token)
+    if issued_at < timezone.now() - timedelta(days=settings.SYNC_LOG_RETENTION_DAYS - 1):
+        return snapshot(club_id, user)
+
+    entries = _settled_entries(club_id).filter(id__gt=seq)
+    if user.role != "admin":
+        entries = entries.filter(~Q(kind=ChangeLogEntry.Kind.RESERVATION) | Q(player=user))
+    limit = settings.SYNC_MAX_CHANGES
+    changes = list(entries.order_by("id").values_list("id", "kind", "object_id")[: limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    ids = {kind: set() for kind in KINDS}
+    for _, kind, object_id in changes:
+        ids[kind].add(object_id)
+    rows = _rows(club_id, user, ids)
+    deleted = {name: sorted(ids[kind] - {row["id"] for row in rows[name]}) for kind, (name, _) in KINDS.items()}
+    return {
+        "token": make_token(changes[-1][0] if changes else seq),
+        "reset": False,
+        "has_more": has_more,
+        **rows,
+        "deleted": deleted,
+    }
+
+
+def purge_change_log():
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_LOG_RETENTION_DAYS)
+    deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,76 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+# Clube (tenant) da requisição atual, definido pelo ClubScopedMixin depois da autenticação.
+_current_club_id = ContextVar("current_club_id", default=None)
+
+
+def current_club_id():
+    return _current_club_id.get()
+
+
+def activate(club_id):
+    return _current_club_id.set(club_id)
+
+
+def deactivate(token):
+    _current_club_id.reset(token)
+
+
+def club_cache_key(club_id):
+    return f"tenant-club:{club_id}"
+
+
+def get_club(club_id):
+    from .models import Club
+
+    key = club_cache_key(club_id)
+    club = cache.get(key)
+    if club is None:
+        club = Club.objects.filter(pk=club_id).first()
+        if club is not None:
+            cache.set(key, club, settings.TENANT_CLUB_CACHE_TTL)
+    return club
+
+
+def current_club():
+    club_id = current_club_id()
+    return get_club(club_id) if club_id is not None else None
+
+
+class ClubScopedManager(models.Manager):
+    """Manager que filtra pelo clube ativo; sem clube ativo não retorna nada."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        club_id = current_club_id()
+        if club_id is None:
+            return queryset.none()
+        return queryset.filter(club_id=club_id)
+
+
+class ClubScopedMixin:
+    """Ativa o clube do usuário autenticado durante a view (``Model.scoped``, ``current_club()``)."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        user = request.user
+        club_id = user.club_id if user.is_authenticated else None
+        self._tenant_token = activate(club_id)
+        # Preenche o cache do FK: request.user.club não consulta o banco de novo.
+        # No batch o usuário já chega com o clube carregado e a busca é pulada.
+        if club_id is not None and not type(user).club.is_cached(user):
+            club = get_club(club_id)
+            if club is not None:
+                user.club = club
+
+    def dispatch(self, request, *args, **kwargs):
+        self._tenant_token = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._tenant_token is not None:
+                deactivate(self._tenant_token)
@@ -1,3 +1,431 @@
-from django.test import TestCase
+import hashlib
+from datetime import datetime, time, timedelta
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .audit import audit_buffer
+from .models import BookingPolicy, Club, ClubUser, Court, CourtMaintenanceWindow, IdempotencyKey, Reservation
+from .usage import usage_buffer
+
+
+def tomorrow_at(hour, minute=0, days=1):
+    return timezone.make_aware(datetime.combine(timezone.localdate() + timedelta(days=days), time(hour, minute)))
+
+
+class ClubTestCase(TestCase):
+    """Clube com um admin, dois jogadores e duas quadras de saibro."""
+
+    def setUp(self):
+        # Política, clube e cotas ficam no cache local entre um teste e outro.
+        cache.clear()
+        self.club = Club.objects.create(name="Clube A", slug="clube-a")
+        self.admin = ClubUser.objects.create(username="admin@a.com", role="admin", club=self.club)
+        self.player = ClubUser.objects.create(username="ana@a.com", role="player", club=self.club)
+        self.other_player = ClubUser.objects.create(username="bia@a.com", role="player", club=self.club)
+        self.court = Court.objects.create(club=self.club, name="Quadra 1", surface=Court.Surface.SAIBRO)
+        self.other_court = Court.objects.create(club=self.club, name="Quadra 2", surface=Court.Surface.SAIBRO)
+        self.client = self.client_for(self.admin)
+
+    def tearDown(self):
+        # Grava agora (dentro da transação do teste) em vez de deixar os timers para outra thread.
+        usage_buffer.flush()
+        audit_buffer.flush()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def reserve(self, player, start, court=None, client=None, minutes=60, **extra):
+        payload = {
+            "court": (court or self.court).pk,
+            "player": player.pk,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(minutes=minutes)).isoformat(),
+            **extra,
+        }
+        return (client or self.client).post("/api/reservations/", payload, format="json")
+
+    def create_reservation(self, player, start, court=None):
+        return Reservation.objects.create(
+            club=self.club,
+            court=court or self.court,
+            player=player,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+        )
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTests(ClubTestCase):
+    def sync(self, client, token=None):
+        response = client.get("/api/sync/", {"since": token} if token else {})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_snapshot_then_delta(self):
+        snapshot = self.sync(self.client)
+        self.assertTrue(snapshot["reset"])
+        self.assertEqual({row["id"] for row in snapshot["courts"]}, {self.court.pk, self.other_court.pk})
+
+        court = Court.objects.create(club=self.club, name="Quadra 3", surface=Court.Surface.RAPIDA)
+        delta = self.sync(self.client, snapshot["token"])
+        self.assertFalse(delta["reset"])
+        self.assertEqual([row["id"] for row in delta["courts"]], [court.pk])
+        self.assertEqual(delta["reservations"], [])
+
+        court_id = court.pk
+        court.delete()
+        delta = self.sync(self.client, delta["token"])
+        self.assertEqual(delta["courts"], [])
+        self.assertEqual(delta["deleted"]["courts"], [court_id])
+
+        self.assertEqual(self.sync(self.client, delta["token"])["deleted"]["courts"], [])
+
+    def test_player_only_receives_own_reservations(self):
+        token = self.sync(self.client_for(self.player))["token"]
+        self.create_reservation(self.other_player, tomorrow_at(10))
+        mine = self.create_reservation(self.player, tomorrow_at(12))
+
+        delta = self.sync(self.client_for(self.player), token)
+        self.assertEqual([row["id"] for row in delta["reservations"]], [mine.pk])
+
+    def test_reservation_moved_to_another_player_is_a_tombstone_for_the_first(self):
+        reservation = self.create_reservation(self.player, tomorrow_at(10))
+        player_token = self.sync(self.client_for(self.player))["token"]
+        other_token = self.sync(self.client_for(self.other_player))["token"]
+
+        # O serializer valida quadra e horário juntos: a alteração manda a reserva inteira.
+        payload = {
+            "court": self.court.pk,
+            "player": self.other_player.pk,
+            "start_time": reservation.start_time.isoformat(),
+            "end_time": reservation.end_time.isoformat(),
+        }
+        response = self.client.patch(f"/api/reservations/{reservation.pk}/", payload, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+
+        previous = self.sync(self.client_for(self.player), player_token)
+        self.assertEqual(previous["reservations"], [])
+        self.assertEqual(previous["deleted"]["reservations"], [reservation.pk])
+        current = self.sync(self.client_for(self.other_player), other_token)
+        self.assertEqual([row["id"] for row in current["reservations"]], [reservation.pk])
+        self.assertEqual(current["deleted"]["reservations"], [])
+
+    def test_deleted_reservation_is_a_tombstone(self):
+        reservation = self.create_reservation(self.player, tomorrow_at(10))
+        token = self.sync(self.client_for(self.player))["token"]
+        reservation_id = reservation.pk
+        reservation.delete()
+
+        delta = self.sync(self.client_for(self.player), token)
+        self.assertEqual(delta["deleted"]["reservations"], [reservation_id])
+
+    @override_settings(SYNC_MAX_CHANGES=2)
+    def test_has_more_pages_through_changes(self):
+        token = self.sync(self.client)["token"]
+        courts = [
+            Court.objects.create(club=self.club, name=f"Nova {number}", surface=Court.Surface.RAPIDA)
+            for number in range(3)
+        ]
+
+        first = self.sync(self.client, token)
+        self.assertTrue(first["has_more"])
+        second = self.sync(self.client, first["token"])
+        self.assertFalse(second["has_more"])
+        received = [row["id"] for row in first["courts"] + second["courts"]]
+        self.assertEqual(received, [court.pk for court in courts])
+
+    def test_old_token_returns_snapshot(self):
+        issued_at = int((timezone.now() - timedelta(days=60)).timestamp())
+        self.assertTrue(self.sync(self.client, f"0.{issued_at}")["reset"])
+
+    def test_invalid_tokens(self):
+        for token in ("abc", "1", "1.2.3", "1.99999999999999999999"):
+            with self.subTest(token=token):
+                response = self.client.get("/api/sync/", {"since": token})
+                self.assertEqual(response.status_code, 400)
+
+
+class IdempotencyTests(ClubTestCase):
+    def payload(self, hour=10):
+        start = tomorrow_at(hour)
+        return {
+            "court": self.court.pk,
+            "player": self.player.pk,
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+        }
+
+    def post(self, payload, key="chave-1"):
+        return self.client.post("/api/reservations/", payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.payload())
+        self.assertEqual(first.status_code, 201, first.data)
+        retry = self.post(self.payload())
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_validation_errors_are_replayed(self):
+        payload = {**self.payload(), "court": None}
+        self.assertEqual(self.post(payload).status_code, 400)
+        retry = self.post(payload)
+        self.assertEqual(retry.status_code, 400)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+    def test_same_key_with_another_body_returns_422(self):
+        self.assertEqual(self.post(self.payload()).status_code, 201)
+        self.assertEqual(self.post(self.payload(hour=14)).status_code, 422)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        self.assertEqual(self.post(self.payload()).status_code, 201)
+        other_admin = ClubUser.objects.create(username="admin2@a.com", role="admin", club=self.club)
+        payload = {**self.payload(hour=14), "player": self.other_player.pk}
+        response = self.client_for(other_admin).post(
+            "/api/reservations/", payload, format="json", HTTP_IDEMPOTENCY_KEY="chave-1"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+
+    def pending_record(self, payload, key="chave-1"):
+        # Mesmo registro que a primeira requisição deixa enquanto a view ainda roda.
+        lookup = hashlib.sha256(f"{self.admin.pk}:POST:/api/reservations/:{key}".encode()).hexdigest()
+        self.assertEqual(self.post(payload, key).status_code, 201)
+        record = IdempotencyKey.objects.get(lookup=lookup)
+        Reservation.objects.all().delete()
+        IdempotencyKey.objects.filter(pk=record.pk).update(status_code=None, response_body=None)
+        return record
+
+    def test_retry_while_processing_returns_409(self):
+        self.pending_record(self.payload())
+        self.assertEqual(self.post(self.payload()).status_code, 409)
+        self.assertFalse(Reservation.objects.exists())
+
+    @override_settings(IDEMPOTENCY_PENDING_TIMEOUT=60)
+    def test_abandoned_key_runs_the_view_again(self):
+        record = self.pending_record(self.payload())
+        IdempotencyKey.objects.filter(pk=record.pk).update(created_at=timezone.now() - timedelta(seconds=61))
+        response = self.post(self.payload())
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_key_too_long(self):
+        self.assertEqual(self.post(self.payload(), key="x" * 256).status_code, 400)
+
+
+class BookingPolicyTests(ClubTestCase):
+    def set_policy(self, **values):
+        response = self.client.patch("/api/booking-policy/", values, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def assertRejected(self, response, message):
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(message, str(response.data))
+
+    def test_defaults_without_saved_policy(self):
+        response = self.client.get("/api/booking-policy/")
+        self.assertEqual(response.data["max_per_day"], 1)
+        self.assertFalse(BookingPolicy.objects.exists())
+
+        self.assertEqual(self.reserve(self.player, tomorrow_at(10)).status_code, 201)
+        self.assertRejected(
+            self.reserve(self.player, tomorrow_at(14), court=self.other_court), "no máximo uma reserva por dia"
+        )
+
+    def test_player_advance_days(self):
+        player_client = self.client_for(self.player)
+        self.assertRejected(self.reserve(self.player, tomorrow_at(10), client=player_client), "dia atual")
+
+        self.set_policy(player_advance_days=2)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(10), client=player_client).status_code, 201)
+        self.assertRejected(
+            self.reserve(self.player, tomorrow_at(10, days=3), client=player_client), "até 2 dias de antecedência"
+        )
+        # Admins não têm limite de antecedência.
+        self.assertEqual(self.reserve(self.player, tomorrow_at(10, days=3)).status_code, 201)
+
+    def test_past_reservations_are_rejected(self):
+        self.assertRejected(self.reserve(self.player, timezone.now() - timedelta(hours=2)), "retroativas")
+
+    def test_max_per_day_and_week(self):
+        self.set_policy(max_per_day=2, max_per_week=3)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(8)).status_code, 201)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(10)).status_code, 201)
+        self.assertRejected(self.reserve(self.player, tomorrow_at(12)), "no máximo 2 reservas por dia")
+
+        self.set_policy(max_per_day=None)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(12)).status_code, 201)
+        self.assertRejected(self.reserve(self.player, tomorrow_at(14)), "no máximo 3 reservas por semana")
+        # Reservas canceladas não contam.
+        Reservation.objects.filter(start_time=tomorrow_at(8)).update(status=Reservation.Status.CANCELED)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(14)).status_code, 201)
+
+    def test_max_duration(self):
+        self.set_policy(max_duration_minutes=90)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(10), minutes=90).status_code, 201)
+        self.assertRejected(self.reserve(self.other_player, tomorrow_at(12), minutes=120), "no máximo 90 minutos")
+
+    def test_peak_weekly_quota(self):
+        self.set_policy(
+            max_per_day=None, peak_starts_at="18:00", peak_ends_at="22:00", peak_weekly_quotas={"treino": 1}
+        )
+        self.assertEqual(self.reserve(self.player, tomorrow_at(18)).status_code, 201)
+        self.assertRejected(self.reserve(self.player, tomorrow_at(20)), "horário de pico")
+        # Fora do pico ou de outro tipo, a cota não se aplica.
+        self.assertEqual(self.reserve(self.player, tomorrow_at(10)).status_code, 201)
+        self.assertEqual(self.reserve(self.player, tomorrow_at(20), type="recreativo").status_code, 201)
+
+    def test_update_excludes_the_reservation_itself(self):
+        response = self.reserve(self.player, tomorrow_at(10))
+        response = self.client.patch(
+            f"/api/reservations/{response.data['id']}/",
+            {
+                "court": self.court.pk,
+                "start_time": tomorrow_at(11).isoformat(),
+                "end_time": tomorrow_at(12).isoformat(),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def test_invalid_policy(self):
+        response = self.client.patch("/api/booking-policy/", {"peak_weekly_quotas": {"treino": 1}}, format="json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(
+            "/api/booking-policy/", {"peak_starts_at": "20:00", "peak_ends_at": "18:00"}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client_for(self.player).patch("/api/booking-policy/", {"max_per_day": 5}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class MaintenanceWindowTests(ClubTestCase):
+    def schedule(self, court, start, end, **extra):
+        payload = {"court": court.pk, "start_time": start.isoformat(), "end_time": end.isoformat(), **extra}
+        return self.client.post("/api/maintenance-windows/", payload, format="json")
+
+    def test_conflicts_move_to_a_similar_free_court(self):
+        reservation = self.create_reservation(self.player, tomorrow_at(10))
+        token = self.client_for(self.player).get("/api/sync/").data["token"]
+
+        response = self.schedule(self.court, tomorrow_at(8), tomorrow_at(12))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual((response.data["moved"], response.data["canceled"]), (1, 0))
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.court_id, self.other_court.pk)
+        self.assertEqual(reservation.status, Reservation.Status.APPROVED)
+
+        delta = self.client_for(self.player).get("/api/sync/", {"since": token}).data
+        self.assertEqual([row["id"] for row in delta["reservations"]], [reservation.pk])
+
+    def test_conflicts_without_a_free_court_are_canceled(self):
+        moved = self.create_reservation(self.player, tomorrow_at(10))
+        stuck = self.create_reservation(self.other_player, tomorrow_at(11))
+        self.create_reservation(self.admin, tomorrow_at(11), court=self.other_court)
+
+        response = self.schedule(self.court, tomorrow_at(8), tomorrow_at(14))
+        self.assertEqual(response.status_code, 201, response.data)
+        statuses = {entry["reservation"]: entry["status"] for entry in response.data["reservations"]}
+        self.assertEqual(statuses, {moved.pk: "moved", stuck.pk: "canceled"})
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, Reservation.Status.CANCELED)
+
+    def test_two_conflicts_do_not_move_to_the_same_slot(self):
+        first = self.create_reservation(self.player, tomorrow_at(10))
+        second = self.create_reservation(self.other_player, tomorrow_at(10, 30))
+
+        response = self.schedule(self.court, tomorrow_at(8), tomorrow_at(14))
+        self.assertEqual((response.data["moved"], response.data["canceled"]), (1, 1))
+        self.assertEqual(Reservation.objects.get(pk=first.pk).court_id, self.other_court.pk)
+        self.assertEqual(Reservation.objects.get(pk=second.pk).status, Reservation.Status.CANCELED)
+
+    def test_cancel_resolution(self):
+        reservation = self.create_reservation(self.player, tomorrow_at(10))
+        response = self.schedule(self.court, tomorrow_at(8), tomorrow_at(12), resolution="cancel")
+        self.assertEqual((response.data["moved"], response.data["canceled"]), (0, 1))
+        reservation.refresh_from_db()
+        self.assertEqual((reservation.court_id, reservation.status), (self.court.pk, Reservation.Status.CANCELED))
+
+    def test_other_surfaces_and_maintenance_windows_are_not_targets(self):
+        Court.objects.filter(pk=self.other_court.pk).update(surface=Court.Surface.RAPIDA)
+        closed = Court.objects.create(club=self.club, name="Quadra 3", surface=Court.Surface.SAIBRO)
+        CourtMaintenanceWindow.objects.create(
+            club=self.club, court=closed, start_time=tomorrow_at(9), end_time=tomorrow_at(11)
+        )
+        reservation = self.create_reservation(self.player, tomorrow_at(10))
+
+        response = self.schedule(self.court, tomorrow_at(8), tomorrow_at(12))
+        self.assertEqual(response.data["canceled"], 1)
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, Reservation.Status.CANCELED)
+
+    def test_window_blocks_new_reservations(self):
+        self.assertEqual(self.schedule(self.court, tomorrow_at(8), tomorrow_at(12)).status_code, 201)
+        response = self.reserve(self.player, tomorrow_at(10))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("manutenção", str(response.data))
+        self.assertEqual(self.schedule(self.court, tomorrow_at(11), tomorrow_at(13)).status_code, 400)
+
+    def test_other_clubs_court_is_rejected(self):
+        other_club = Club.objects.create(name="Clube B", slug="clube-b")
+        court = Court.objects.create(club=other_club, name="Quadra B", surface=Court.Surface.SAIBRO)
+        self.assertEqual(self.schedule(court, tomorrow_at(8), tomorrow_at(12)).status_code, 400)
+
+    def test_list_filters(self):
+        self.schedule(self.court, tomorrow_at(8), tomorrow_at(12))
+        self.schedule(self.other_court, tomorrow_at(8), tomorrow_at(12))
+        response = self.client.get("/api/maintenance-windows/", {"court": self.court.pk})
+        self.assertEqual([row["court"] for row in response.data], [self.court.pk])
+        self.assertEqual(self.client.get("/api/maintenance-windows/", {"court": "abc"}).status_code, 400)
+
+
+class ClubQuotaThrottleTests(ClubTestCase):
+    def test_without_quota_requests_are_not_counted(self):
+        for _ in range(3):
+            response = self.client.get("/api/me/")
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Club-Quota-Warning", response)
+
+    def test_soft_then_hard_quota(self):
+        Club.objects.filter(pk=self.club.pk).update(hourly_soft_quota=1, hourly_hard_quota=3)
+        cache.clear()
+
+        self.assertNotIn("X-Club-Quota-Warning", self.client.get("/api/me/"))
+        with self.assertLogs("core.usage", "WARNING") as logs:
+            for count in (2, 3):
+                response = self.client.get("/api/me/")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response["X-Club-Quota-Warning"], f"{count}/1 requisições nesta hora")
+        # O aviso vai para o log uma vez por hora, não a cada requisição acima da cota.
+        self.assertEqual(len(logs.records), 1)
+        response = self.client.get("/api/me/")
+        self.assertEqual(response.status_code, 429)
+        self.assertLessEqual(int(response["Retry-After"]), 60 * 60)
+
+    def test_quota_is_per_club(self):
+        Club.objects.filter(pk=self.club.pk).update(hourly_hard_quota=1)
+        cache.clear()
+        other_club = Club.objects.create(name="Clube B", slug="clube-b", hourly_hard_quota=1)
+        other_admin = ClubUser.objects.create(username="admin@b.com", role="admin", club=other_club)
+
+        self.assertEqual(self.client.get("/api/me/").status_code, 200)
+        self.assertEqual(self.client.get("/api/me/").status_code, 429)
+        self.assertEqual(self.client_for(other_admin).get("/api/me/").status_code, 200)
+
+    @override_settings(CLUB_HOURLY_HARD_QUOTA=1)
+    def test_setting_is_the_default_and_club_zero_disables(self):
+        self.assertEqual(self.client.get("/api/me/").status_code, 200)
+        self.assertEqual(self.client.get("/api/me/").status_code, 429)
+
+        Club.objects.filter(pk=self.club.pk).update(hourly_hard_quota=0)
+        cache.clear()
+        self.assertEqual(self.client.get("/api/me/").status_code, 200)
@@ -8,6 +8,7 @@ router = DefaultRouter()
 router.register(r'courts', views.CourtViewSet, basename='court')
 router.register(r'coaches', views.CoachViewSet, basename='coach')
 router.register(r'reservations', views.ReservationViewSet, basename='reservation')
+router.register(r'maintenance-windows', views.CourtMaintenanceWindowViewSet, basename='maintenance-window')
 router.register(r'club-users', views.ClubUserViewSet, basename='club-user')
 
 urlpatterns = [
@@ -17,6 +18,16 @@ urlpatterns = [
     path('auth/password/forgot/', views.ForgotPasswordView.as_view(), name='password_forgot'),
     path('auth/password/reset/', views.ResetPasswordView.as_view(), name='password_reset'),
     path('clubs/check-slug/', views.ClubSlugAvailabilityView.as_view(), name='club_slug_check'),
+    path('clubs/live/', views.ClubLiveView.as_view(), name='club_live'),
+    path('stats/players/', views.PlayerStatsView.as_view(), name='player_stats'),
+    path('calendar/', views.CalendarFeedView.as_view(), name='calendar_feed'),
+    path('calendar/<str:token>.ics', views.CalendarFeedICSView.as_view(), name='calendar_feed_ics'),
+    path('booking-policy/', views.BookingPolicyView.as_view(), name='booking_policy'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path('audit/', views.AuditLogView.as_view(), name='audit_log'),
+    path('sync/', views.SyncView.as_view(), name='sync'),
+    path('usage/', views.ClubUsageView.as_view(), name='club_usage'),
+    path('batch/', views.BatchView.as_view(), name='batch'),
     path('me/', views.MeView.as_view(), name='me'),
     path('', include(router.urls)),
 ]
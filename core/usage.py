@@ -0,0 +1,232 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection, connections, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject, empty
+from rest_framework.throttling import BaseThrottle
+
+from .models import Club, ClubUsage
+from .tenancy import get_club
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("requests", "throttled", "queries", "db_time_ms", "rows")
+
+
+def current_period(now=None):
+    """Início da hora: a unidade do ClubUsage e das cotas."""
+    return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+class QueryMeter:
+    """``execute_wrapper`` que soma as consultas da requisição, o tempo delas e as linhas informadas pelo driver."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            rowcount = getattr(context["cursor"], "rowcount", -1)
+            if rowcount > 0:
+                self.rows += rowcount
+
+
+def _add_usage(club_id, period, counters):
+    increments = {name: F(name) + value for name, value in counters.items()}
+    if ClubUsage.objects.filter(club_id=club_id, period=period).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            ClubUsage.objects.create(club_id=club_id, period=period, **counters)
+    except IntegrityError:
+        # Outro worker criou a linha da hora entre o update e o create.
+        ClubUsage.objects.filter(club_id=club_id, period=period).update(**increments)
+
+
+class UsageBuffer:
+    """Contadores de uso por (clube, hora) em memória, somados na ClubUsage.
+
+    Grava ``USAGE_FLUSH_INTERVAL`` segundos depois do primeiro contador pendente, numa thread à parte;
+    o que sobrar é gravado na saída do processo. Cada flush faz um UPDATE por clube ativo no intervalo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+
+    def add(self, club_id, **values):
+        key = (club_id, current_period())
+        with self._lock:
+            counters = self._pending.get(key)
+            if counters is None:
+                counters = self._pending[key] = dict.fromkeys(COUNTERS, 0)
+            for name, value in values.items():
+                counters[name] += value
+            if self._timer is None:
+                self._timer = threading.Timer(settings.USAGE_FLUSH_INTERVAL, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        try:
+            # Clubes removidos desde a requisição ficam de fora (a linha violaria a FK).
+            club_ids = {club_id for club_id, _ in pending}
+            existing = set(Club.objects.filter(pk__in=club_ids).values_list("pk", flat=True))
+            for (club_id, period), counters in pending.items():
+                if club_id in existing:
+                    _add_usage(club_id, period, {name: round(value) for name, value in counters.items()})
+        except DatabaseError:
+            logger.exception("Falha ao gravar o uso de %d clube(s)", len(pending))
+            return 0
+        return len(pending)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # A thread do timer abre a própria conexão; fecha para não deixá-la pendurada.
+            connections.close_all()
+
+
+usage_buffer = UsageBuffer()
+atexit.register(usage_buffer.flush)
+
+
+def request_club_id(request):
+    user = getattr(request, "user", None)
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+        # Usuário da sessão nunca consultado: requisição sem JWT (login, feed ICS, schema).
+        return None
+    return getattr(user, "club_id", None)
+
+
+class ClubUsageMiddleware:
+    """Atribui cada requisição ao clube do usuário, com as consultas, o tempo e as linhas no banco.
+
+    O usuário do JWT só é conhecido depois da view, então a conta é feita na volta da resposta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        meter = QueryMeter()
+        with connection.execute_wrapper(meter):
+            response = self.get_response(request)
+        club_id = request_club_id(request)
+        if club_id is not None:
+            usage_buffer.add(
+                club_id,
+                requests=1,
+                throttled=int(response.status_code == 429),
+                queries=meter.queries,
+                db_time_ms=meter.db_time * 1000,
+                rows=meter.rows,
+            )
+        warning = getattr(request, "club_quota_warning", None)
+        if warning is not None:
+            response.headers["X-Club-Quota-Warning"] = warning
+        return response
+
+
+def club_quotas(club):
+    """Cotas (leve, rígida) de requisições por hora; 0 desliga."""
+    soft = club.hourly_soft_quota if club.hourly_soft_quota is not None else settings.CLUB_HOURLY_SOFT_QUOTA
+    hard = club.hourly_hard_quota if club.hourly_hard_quota is not None else settings.CLUB_HOURLY_HARD_QUOTA
+    return soft, hard
+
+
+def quota_cache_key(club_id, period):
+    return f"club-requests:{club_id}:{period:%Y%m%d%H}"
+
+
+def count_request(club_id):
+    key = quota_cache_key(club_id, current_period())
+    # A chave vale só até o fim da hora (com folga para relógios um pouco diferentes entre workers).
+    cache.add(key, 0, 60 * 60 + 60)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, 60 * 60 + 60)
+        return 1
+
+
+class ClubQuotaThrottle(BaseThrottle):
+    """Cotas por hora do clube do usuário, contadas no cache (compartilhado entre workers com ``CACHE_URL``).
+
+    Acima da cota leve a requisição passa com o header ``X-Club-Quota-Warning``; acima da rígida o
+    clube recebe 429 até a próxima hora. Clubes sem cota não tocam no cache.
+    """
+
+    def allow_request(self, request, view):
+        user = request.user
+        club_id = user.club_id if user.is_authenticated else None
+        club = get_club(club_id) if club_id is not None else None
+        if club is None:
+            return True
+        soft, hard = club_quotas(club)
+        if not soft and not hard:
+            return True
+        count = count_request(club_id)
+        if soft and count > soft:
+            if count == soft + 1:
+                logger.warning("Clube %s passou da cota leve de %d requisições/hora", club_id, soft)
+            request._request.club_quota_warning = f"{count}/{soft} requisições nesta hora"
+        return not hard or count <= hard
+
+    def wait(self):
+        now = timezone.now()
+        return (current_period(now) + timedelta(hours=1) - now).total_seconds()
+
+
+def usage_report(club, days, group):
+    """Uso do clube nos últimos ``days`` dias, por hora ou por dia (fuso ``TIME_ZONE``)."""
+    queryset = ClubUsage.objects.filter(club=club, period__gte=current_period() - timedelta(days=days))
+    bucket = TruncDate("period") if group == "day" else F("period")
+    sums = {name: Sum(name) for name in COUNTERS}
+    periods = list(queryset.annotate(bucket=bucket).values("bucket").annotate(**sums).order_by("bucket"))
+    totals = {name: sum(row[name] for row in periods) for name in COUNTERS}
+    soft, hard = club_quotas(club)
+    quota = None
+    if soft or hard:
+        quota = {
+            "soft": soft or None,
+            "hard": hard or None,
+            "current_hour": cache.get(quota_cache_key(club.pk, current_period()), 0),
+        }
+    return {
+        "group": group,
+        "days": days,
+        "quota": quota,
+        "totals": totals,
+        "periods": [{"period": row.pop("bucket"), **row} for row in periods],
+    }
+
+
+def purge_usage():
+    cutoff = current_period() - timedelta(days=settings.USAGE_RETENTION_DAYS)
+    deleted, _ = ClubUsage.objects.filter(period__lt=cutoff).delete()
+    return deleted
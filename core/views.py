@@ -1,38 +1,80 @@
+import csv
 import logging
+from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.handlers.asgi import ASGIRequest
 from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import F, Window
+from django.db.models.functions import Rank, RowNumber
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
 from django.utils.encoding import force_bytes, force_str
-from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.http import http_date, urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.text import slugify
-from rest_framework import mixins, permissions, serializers, status, viewsets
+from django.views import View
+from rest_framework import generics, mixins, permissions, serializers, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from .models import Club, Coach, Court, Reservation
+from . import calendar
+from .audit import AuditedMixin, audit_buffer
+from .batch import READ_METHODS, read_snapshot, run_batch
+from .authentication import QueryParamJWTAuthentication
+from .availability import occupied_slots
+from .idempotency import idempotent
+from .live import event_stream
+from .maintenance import resolve_conflicts
+from .member_import import MODE_INVITE, MODE_PASSWORD, import_members
+from .models import (
+    AuditLogEntry,
+    BookingPolicy,
+    CalendarFeed,
+    Club,
+    Coach,
+    Court,
+    CourtMaintenanceWindow,
+    PlayerStats,
+    Reservation,
+    generate_calendar_token,
+)
+from .pagination import AuditLogPagination, LeaderboardPagination
+from .parsers import CSVParser, read_csv
+from .passwords import PASSWORD_REQUIREMENTS, password_is_strong, password_reset_token
 from .permissions import IsClubAdmin, IsClubStaffOrReadOnly, IsOwnerOrClubAdmin
-from .serializers import CoachSerializer, CourtSerializer, ReservationSerializer, UserSerializer
+from .renderers import CompactJSONRenderer
+from .rows import court_rows, player_name_expression, reservation_rows
+from .search import SEARCH_FIELDS, search
+from .serializers import (
+    AuditLogEntrySerializer,
+    BookingPolicySerializer,
+    CoachSerializer,
+    CourtMaintenanceWindowSerializer,
+    CourtSerializer,
+    PlayerStatsSerializer,
+    ReservationSerializer,
+    UserSerializer,
+)
+from .slug_index import slug_index
+from .sync import InvalidToken, changes_since, snapshot
+from .tenancy import ClubScopedMixin, current_club
+from .usage import usage_buffer, usage_report
 
 User = get_user_model()
-password_reset_token = PasswordResetTokenGenerator()
-PASSWORD_REQUIREMENTS = "A senha deve ter pelo menos 8 caracteres e conter letras e números."
 logger = logging.getLogger(__name__)
 
 
-def password_is_strong(password: str | None) -> bool:
-    if not password or len(password) < 8:
-        return False
-    has_letter = any(char.isalpha() for char in password)
-    has_digit = any(char.isdigit() for char in password)
-    return has_letter and has_digit
-
-
 class ClubTokenObtainPairSerializer(TokenObtainPairSerializer):
     email = serializers.EmailField(write_only=True, required=False)
 
@@ -71,13 +113,61 @@ class ClubSlugAvailabilityView(APIView):
         raw_slug = (request.query_params.get("slug") or "").strip()
         normalized_slug = slugify(raw_slug)
         is_valid = bool(normalized_slug)
-        available = is_valid and not Club.objects.filter(slug=normalized_slug).exists()
-        return Response({"slug": normalized_slug, "valid": is_valid, "available": available})
+        available = is_valid and not slug_index.is_taken(normalized_slug)
+        suggestions = []
+        if is_valid and not available:
+            try:
+                limit = int(request.query_params.get("suggestions", settings.CLUB_SLUG_SUGGESTIONS))
+            except ValueError:
+                limit = settings.CLUB_SLUG_SUGGESTIONS
+            limit = max(0, min(limit, settings.CLUB_SLUG_MAX_SUGGESTIONS))
+            suggestions = slug_index.suggestions(normalized_slug, limit)
+        return Response(
+            {"slug": normalized_slug, "valid": is_valid, "available": available, "suggestions": suggestions}
+        )
+
+
+class ClubLiveView(APIView):
+    authentication_classes = [QueryParamJWTAuthentication]
+
+    def get(self, request):
+        if not isinstance(request._request, ASGIRequest):
+            return Response(
+                {"detail": "Stream disponível apenas no servidor ASGI."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        club_id = request.user.club_id
+        if not club_id:
+            return Response({"detail": "Usuário sem clube."}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        occupied = dict(
+            Reservation.objects.filter(
+                club_id=club_id,
+                start_time__lte=now,
+                end_time__gt=now,
+            )
+            .exclude(status=Reservation.Status.CANCELED)
+            .values_list("court_id", "id")
+        )
+        snapshot = {
+            "courts": [
+                {"id": court_id, "name": name, "status": court_status, "reservation": occupied.get(court_id)}
+                for court_id, name, court_status in Court.objects.filter(club_id=club_id).values_list(
+                    "id", "name", "status"
+                )
+            ]
+        }
+        response = StreamingHttpResponse(event_stream(club_id, snapshot), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
 
 
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
 
+    @idempotent
     def post(self, request):
         data = request.data
         email = (data.get("email") or "").strip().lower()
@@ -204,55 +294,163 @@ class ResetPasswordView(APIView):
         return Response({"detail": "Senha atualizada com sucesso."})
 
 
-class MeView(APIView):
+class BatchView(ClubScopedMixin, APIView):
+    """Executa várias requisições da API em uma só ida e volta, na ordem enviada."""
+
+    def post(self, request):
+        items = request.data.get("requests") if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response({"detail": "Envie a lista requests."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {"detail": f"Máximo de {settings.BATCH_MAX_REQUESTS} requisições por batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not request.data.get("snapshot"):
+            return Response({"responses": run_batch(request, items, BatchView)})
+        if any(str(item.get("method") or "GET").upper() not in READ_METHODS for item in items):
+            return Response(
+                {"detail": "snapshot aceita apenas requisições GET."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        with read_snapshot():
+            return Response({"responses": run_batch(request, items, BatchView)})
+
+
+class SearchView(ClubScopedMixin, APIView):
+    """Busca membros (nome, usuário e e-mail), professores e quadras do clube, ordenados por semelhança."""
+
+    permission_classes = [permissions.IsAuthenticated, IsClubAdmin]
+
+    def get(self, request):
+        query = (request.query_params.get("q") or "").strip()
+        if len(query) < 2:
+            return Response({"detail": "Informe ao menos 2 caracteres em q."}, status=status.HTTP_400_BAD_REQUEST)
+        kinds = [kind for kind in (request.query_params.get("type") or "").split(",") if kind]
+        unknown = set(kinds) - set(SEARCH_FIELDS)
+        if unknown:
+            return Response(
+                {"detail": f"Tipos válidos: {', '.join(SEARCH_FIELDS)}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, settings.SEARCH_MAX_RESULTS))
+        results = search(request.user.club_id, query, kinds or tuple(SEARCH_FIELDS), limit)
+        return Response({"results": results})
+
+
+class SyncView(ClubScopedMixin, APIView):
+    """Quadras, coaches e reservas alterados desde o último sync do app (``?since=<token>``)."""
+
+    def get(self, request):
+        since = request.query_params.get("since")
+        if not since:
+            return Response(snapshot(request.user.club_id, request.user))
+        try:
+            return Response(changes_since(request.user.club_id, request.user, since))
+        except InvalidToken:
+            return Response({"detail": "Token de sync inválido."}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MeView(ClubScopedMixin, APIView):
     def get(self, request):
         return Response(UserSerializer(request.user).data)
 
 
-class CourtViewSet(viewsets.ModelViewSet):
+class CourtViewSet(ClubScopedMixin, AuditedMixin, viewsets.ModelViewSet):
     serializer_class = CourtSerializer
     permission_classes = [IsClubStaffOrReadOnly]
     pagination_class = None
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
 
     def get_queryset(self):
-        return Court.objects.filter(club=self.request.user.club)
+        return Court.scoped.all()
+
+    def list(self, request, *args, **kwargs):
+        return Response(court_rows(self.filter_queryset(self.get_queryset())))
 
     def perform_create(self, serializer):
-        serializer.save(club=self.request.user.club)
+        serializer.save(club=current_club())
 
     def perform_update(self, serializer):
-        serializer.save(club=self.request.user.club)
+        serializer.save(club=current_club())
 
 
-class CoachViewSet(viewsets.ModelViewSet):
+class CoachViewSet(ClubScopedMixin, AuditedMixin, viewsets.ModelViewSet):
     serializer_class = CoachSerializer
     permission_classes = [IsClubStaffOrReadOnly]
     pagination_class = None
 
     def get_queryset(self):
-        return Coach.objects.filter(club=self.request.user.club)
+        return Coach.scoped.all()
+
+    @action(detail=True, methods=["get"])
+    def availability(self, request, pk=None):
+        coach = self.get_object()
+        day = parse_date(request.query_params.get("date") or "")
+        if not day:
+            return Response({"detail": "Informe date no formato YYYY-MM-DD."}, status=400)
+
+        start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+        kickoffs = Reservation.objects.filter(
+            coach=coach,
+            start_time__gte=start,
+            start_time__lt=start + timedelta(days=1),
+        ).values_list("start_time", flat=True)
+        occupied = [timezone.localtime(kickoff).strftime("%H:%M") for kickoff in kickoffs.order_by("start_time")]
+        return Response({"occupied": occupied})
+
+    @action(detail=True, methods=["get"], permission_classes=[permissions.IsAuthenticated, IsClubAdmin])
+    def schedule(self, request, pk=None):
+        coach = self.get_object()
+        day = parse_date(request.query_params.get("week") or "") or timezone.localdate()
+        week_start = day - timedelta(days=day.weekday())
+        start = timezone.make_aware(datetime.combine(week_start, datetime.min.time()))
+        reservations = Reservation.objects.filter(
+            coach=coach,
+            start_time__gte=start,
+            start_time__lt=start + timedelta(days=7),
+        ).order_by("start_time")
+        return Response(
+            {
+                "coach": coach.id,
+                "week_start": week_start.isoformat(),
+                "reservations": reservation_rows(reservations),
+            }
+        )
 
     def perform_create(self, serializer):
-        serializer.save(club=self.request.user.club)
+        serializer.save(club=current_club())
 
     def perform_update(self, serializer):
-        serializer.save(club=self.request.user.club)
+        serializer.save(club=current_club())
 
 
-class ReservationViewSet(viewsets.ModelViewSet):
+class ReservationViewSet(ClubScopedMixin, AuditedMixin, viewsets.ModelViewSet):
     serializer_class = ReservationSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrClubAdmin]
     pagination_class = None
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
 
     def get_queryset(self):
-        queryset = Reservation.objects.filter(club=self.request.user.club)
+        queryset = Reservation.scoped.all()
         if self.request.user.role != "admin":
             queryset = queryset.filter(player=self.request.user)
-        return queryset.select_related("court", "player")
+        return queryset.select_related("court", "player", "coach")
+
+    def list(self, request, *args, **kwargs):
+        return Response(reservation_rows(self.filter_queryset(self.get_queryset())))
+
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(
-            club=self.request.user.club,
+            club=current_club(),
             player=serializer.validated_data.get("player"),
         )
 
@@ -266,23 +464,178 @@ class ReservationViewSet(viewsets.ModelViewSet):
         if not court_id or not date:
             return Response({"detail": "Informe court e date no formato YYYY-MM-DD."}, status=400)
 
-        start = timezone.datetime.fromisoformat(f"{date}T00:00:00+00:00")
-        end = timezone.datetime.fromisoformat(f"{date}T23:59:59+00:00")
-        reservations = Reservation.objects.filter(
-            club=request.user.club,
-            court_id=court_id,
-            start_time__range=(start, end),
+        return Response({"occupied": occupied_slots(request.user.club_id, court_id, date)})
+
+
+class BookingPolicyView(ClubScopedMixin, generics.RetrieveUpdateAPIView):
+    serializer_class = BookingPolicySerializer
+    permission_classes = [IsClubStaffOrReadOnly]
+    http_method_names = ["get", "patch", "head", "options"]
+
+    def get_object(self):
+        policy = BookingPolicy.objects.filter(club=current_club()).first()
+        # Sem política salva, devolve os padrões sem gravar nada; o PATCH cria o registro.
+        return policy or BookingPolicy(club=current_club())
+
+
+class CourtMaintenanceWindowViewSet(
+    ClubScopedMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    serializer_class = CourtMaintenanceWindowSerializer
+    permission_classes = [IsClubStaffOrReadOnly]
+    pagination_class = None
+
+    def get_queryset(self):
+        queryset = CourtMaintenanceWindow.scoped.select_related("court")
+        court_id = self.request.query_params.get("court")
+        if court_id:
+            if not court_id.isdigit():
+                raise serializers.ValidationError({"court": "Informe um id numérico."})
+            queryset = queryset.filter(court_id=int(court_id))
+        if self.action == "list" and not self.request.query_params.get("past"):
+            queryset = queryset.filter(end_time__gt=timezone.now())
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        resolution = serializer.validated_data.pop("resolution")
+        with transaction.atomic():
+            window = serializer.save(club=current_club(), created_by=request.user)
+            report = resolve_conflicts(window, resolution)
+        summary = {key: sum(1 for entry in report if entry["status"] == key) for key in ("moved", "canceled")}
+        return Response({**serializer.data, **summary, "reservations": report}, status=status.HTTP_201_CREATED)
+
+
+class PlayerStatsView(ClubScopedMixin, generics.ListAPIView):
+    serializer_class = PlayerStatsSerializer
+    permission_classes = [permissions.IsAuthenticated, IsClubAdmin]
+    pagination_class = LeaderboardPagination
+
+    def get_queryset(self):
+        ranking = [F("total_reservations").desc(), F("player_id").asc()]
+        return PlayerStats.scoped.annotate(
+            player_name=player_name_expression(),
+            favourite_court_name=F("favourite_court__name"),
+            rank=Window(Rank(), order_by=F("total_reservations").desc()),
+            position=Window(RowNumber(), order_by=ranking),
         )
-        occupied = []
-        for res in reservations:
-            kickoff = res.start_time
-            if timezone.is_naive(kickoff):
-                kickoff = timezone.make_aware(kickoff, timezone.get_current_timezone())
-            occupied.append(timezone.localtime(kickoff).strftime("%H:%M"))
-        return Response({"occupied": occupied})
+
+
+class AuditLogView(ClubScopedMixin, generics.ListAPIView):
+    """Alterações feitas pela API no clube, das mais recentes para as mais antigas."""
+
+    serializer_class = AuditLogEntrySerializer
+    permission_classes = [permissions.IsAuthenticated, IsClubAdmin]
+    pagination_class = AuditLogPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = AuditLogEntry.objects.filter(club_id=self.request.user.club_id)
+        if params.get("kind"):
+            queryset = queryset.filter(kind=params["kind"])
+        if params.get("action"):
+            queryset = queryset.filter(action=params["action"])
+        for param, lookup in (("object", "object_id"), ("actor", "actor_id")):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise serializers.ValidationError({param: "Informe um id numérico."})
+                queryset = queryset.filter(**{lookup: int(value)})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        # Entradas ainda no buffer deste processo entram na consulta.
+        audit_buffer.flush()
+        return super().list(request, *args, **kwargs)
+
+
+class ClubUsageView(ClubScopedMixin, APIView):
+    """Uso da API pelo clube (requisições, tempo e linhas no banco) por dia ou hora, com as cotas."""
+
+    permission_classes = [permissions.IsAuthenticated, IsClubAdmin]
+
+    def get(self, request):
+        group = request.query_params.get("group", "day")
+        if group not in ("day", "hour"):
+            return Response({"detail": "Use group=day ou group=hour."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            days = int(request.query_params.get("days", 7))
+        except ValueError:
+            days = 7
+        days = max(1, min(days, settings.USAGE_RETENTION_DAYS))
+        # Contadores ainda no buffer deste processo entram no relatório.
+        usage_buffer.flush()
+        return Response(usage_report(current_club(), days, group))
+
+
+class CalendarFeedView(ClubScopedMixin, APIView):
+    """Link do feed ICS do jogador logado ou, para admins, de uma quadra (``?court=<id>``)."""
+
+    def get_feed(self, request):
+        if request.user.club_id is None:
+            # O feed pertence a um clube (coluna obrigatória); sem ele o get_or_create daria IntegrityError.
+            raise serializers.ValidationError({"detail": "Usuário sem clube."})
+        court_id = request.query_params.get("court")
+        if not court_id:
+            feed, _ = CalendarFeed.objects.get_or_create(
+                player=request.user,
+                defaults={"club": current_club(), "kind": CalendarFeed.Kind.PLAYER},
+            )
+            return feed
+        if request.user.role != "admin":
+            raise PermissionDenied("Apenas administradores podem publicar a agenda da quadra.")
+        try:
+            court = Court.scoped.get(pk=court_id)
+        except (Court.DoesNotExist, ValueError):
+            raise Http404
+        feed, _ = CalendarFeed.objects.get_or_create(
+            court=court,
+            defaults={"club_id": court.club_id, "kind": CalendarFeed.Kind.COURT},
+        )
+        return feed
+
+    def feed_response(self, request, feed):
+        url = reverse("calendar_feed_ics", kwargs={"token": feed.token})
+        return Response({"kind": feed.kind, "token": feed.token, "url": request.build_absolute_uri(url)})
+
+    def get(self, request):
+        return self.feed_response(request, self.get_feed(request))
+
+    def post(self, request):
+        """Gera um novo token, invalidando o link anterior."""
+        feed = self.get_feed(request)
+        feed.token = generate_calendar_token()
+        feed.save(update_fields=["token", "updated_at"])
+        return self.feed_response(request, feed)
+
+
+class CalendarFeedICSView(View):
+    """Feed ICS público por token; clientes que repetem o ``ETag`` recebem 304 após uma única consulta."""
+
+    def get(self, request, token):
+        feed = CalendarFeed.objects.select_related("court").filter(token=token).first()
+        if feed is None:
+            raise Http404
+        etag = calendar.etag(feed)
+        last_modified = int(calendar.last_modified(feed).timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = StreamingHttpResponse(calendar.render_feed(feed), content_type="text/calendar; charset=utf-8")
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, max-age=0, must-revalidate"
+        return response
 
 
 class ClubUserViewSet(
+    ClubScopedMixin,
+    AuditedMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -292,15 +645,58 @@ class ClubUserViewSet(
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated, IsClubAdmin]
     pagination_class = None
-    http_method_names = ["get", "patch", "delete", "head", "options"]
+    http_method_names = ["get", "post", "patch", "delete", "head", "options"]
 
     def get_queryset(self):
-        queryset = User.objects.filter(club=self.request.user.club)
+        queryset = User.scoped.select_related("club")
         role = self.request.query_params.get("role")
         if role:
             queryset = queryset.filter(role=role)
         return queryset.order_by("username")
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[JSONParser, CSVParser, MultiPartParser],
+    )
+    def import_members(self, request):
+        data = request.data
+        mode = request.query_params.get("mode") or MODE_INVITE
+        if isinstance(data, dict):
+            mode = data.get("mode") or mode
+            upload = request.FILES.get("file")
+            if upload is not None:
+                try:
+                    rows = read_csv(upload.read().decode("utf-8-sig"))
+                except (UnicodeDecodeError, csv.Error):
+                    return Response({"detail": "CSV inválido."}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                rows = data.get("users")
+        else:
+            rows = data
+
+        # No JSON o modo pode chegar como lista ou objeto (não hasheáveis).
+        if not isinstance(mode, str) or mode not in {MODE_INVITE, MODE_PASSWORD}:
+            return Response({"detail": "Modo inválido. Use invite ou password."}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+            return Response({"detail": "Envie a lista de usuários (CSV ou JSON)."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+            return Response(
+                {"detail": f"Máximo de {settings.BULK_IMPORT_MAX_ROWS} usuários por importação."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            report = import_members(current_club(), rows, mode)
+        except IntegrityError:
+            return Response(
+                {"detail": "Alguns emails foram cadastrados durante a importação. Tente novamente."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        summary = {key: sum(1 for entry in report if entry["status"] == key) for key in ("created", "skipped", "error")}
+        return Response({**summary, "rows": report}, status=status.HTTP_201_CREATED)
+
     def perform_destroy(self, instance):
         if instance == self.request.user:
             raise serializers.ValidationError({"detail": "Você não pode remover seu próprio usuário."})